@@ -1,90 +1,78 @@
-from .base_agent import BaseAgent
-from .ceo_agent import CEOAgent
-from .summarizer_agent import SummarizerAgent
-from .marketing_agents import (
-    SEOManager,
-    ContentMarketingManager,
-    DigitalStrategyManager,
-    AdvertisingManager,
-    SocialMediaManager,
-    EmailMarketingManager,
-    AnalyticsManager
-)
+from importlib import import_module
+from .registry import AgentRegistry, get_agent_registry
+
+# Agent classes are imported on first access (PEP 562) so that importing the
+# package does not load LangChain; the registry imports them as agents are used
+_LAZY_ATTRIBUTES = {
+    "BaseAgent": ".base_agent",
+    "CEOAgent": ".ceo_agent",
+    "SummarizerAgent": ".summarizer_agent",
+    "SEOManager": ".marketing_agents",
+    "ContentMarketingManager": ".marketing_agents",
+    "DigitalStrategyManager": ".marketing_agents",
+    "AdvertisingManager": ".marketing_agents",
+    "SocialMediaManager": ".marketing_agents",
+    "EmailMarketingManager": ".marketing_agents",
+    "AnalyticsManager": ".marketing_agents"
+}
+
+def __getattr__(name: str):
+    module = _LAZY_ATTRIBUTES.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(import_module(module, __name__), name)
+    globals()[name] = value
+    return value
+
+def __dir__():
+    return sorted([*globals(), *_LAZY_ATTRIBUTES])
 
 def initialize_agents() -> dict:
     """
     Initialize and return all agents in a structured dictionary.
     
+    Agents come from the ontology-backed registry and are keyed by their
+    ma:code; prefer get_agent_registry() to construct agents only when used.
+    
     Returns:
         dict: Dictionary containing all initialized agents
     """
-    return {
-        "ceo": CEOAgent(),
-        "summarizer": SummarizerAgent(),
-        "seo": SEOManager(),
-        "content": ContentMarketingManager(),
-        "strategy": DigitalStrategyManager(),
-        "advertising": AdvertisingManager(),
-        "social": SocialMediaManager(),
-        "email": EmailMarketingManager(),
-        "analytics": AnalyticsManager()
-    }
+    return get_agent_registry().all()
 
 def get_agent_configurations() -> dict:
     """
     Get the configuration details for all agents.
     
+    Descriptions and responsibilities are read from the ontology, keyed by
+    each agent's ma:code.
+    
     Returns:
         dict: Dictionary containing agent configurations
     """
     return {
-        "ceo": {
-            "description": "Chief Marketing Officer responsible for overall strategy and delegation",
-            "responsibilities": ["Task decomposition", "Strategy planning", "Final decision making"]
-        },
-        "summarizer": {
-            "description": "Agent responsible for compiling and summarizing department responses",
-            "responsibilities": ["Data aggregation", "Report generation", "Executive summary creation"]
-        },
-        "seo": {
-            "description": "SEO Manager specialized in search optimization and keyword strategy",
-            "responsibilities": ["Keyword research", "SEO optimization", "Technical SEO audits"]
-        },
-        "content": {
-            "description": "Content Marketing Manager focused on creating effective content strategies",
-            "responsibilities": ["Content strategy", "Editorial planning", "Content performance analysis"]
-        },
-        "strategy": {
-            "description": "Digital Strategy Manager responsible for overall marketing strategy",
-            "responsibilities": ["Strategic planning", "Channel strategy", "Budget allocation"]
-        },
-        "advertising": {
-            "description": "Advertising Manager specialized in paid advertising campaigns",
-            "responsibilities": ["Campaign management", "Ad platform selection", "Performance optimization"]
-        },
-        "social": {
-            "description": "Social Media Manager focused on social media strategy and engagement",
-            "responsibilities": ["Social media planning", "Community management", "Influencer marketing"]
-        },
-        "email": {
-            "description": "Email Marketing Manager specialized in email campaigns and automation",
-            "responsibilities": ["Email campaign strategy", "List segmentation", "Automation workflows"]
-        },
-        "analytics": {
-            "description": "Analytics Manager focused on tracking and analyzing marketing performance",
-            "responsibilities": ["Data analysis", "Performance tracking", "Reporting"]
+        spec.code: {
+            "description": spec.description,
+            "responsibilities": list(spec.responsibilities)
         }
+        for spec in get_agent_registry().specs()
     }
 
-def get_department_agents() -> dict:
+def get_department_agents(agents: dict = None) -> dict:
     """
     Get only the department-specific agents.
     
+    Args:
+        agents (dict, optional): Already initialized agents to select from.
+            When omitted, the registry's departments are returned, each
+            constructed on first lookup.
+    
     Returns:
         dict: Dictionary containing department agents
     """
-    agents = initialize_agents()
-    return {k: v for k, v in agents.items() if k not in ["ceo", "summarizer"]}
+    registry = get_agent_registry()
+    if agents is None:
+        return registry.departments()
+    return {k: v for k, v in agents.items() if k in registry.department_codes}
 
 # Export specific agents for direct access
 __all__ = [
@@ -97,6 +85,8 @@ __all__ = [
     'SocialMediaManager',
     'EmailMarketingManager',
     'AnalyticsManager',
+    'AgentRegistry',
+    'get_agent_registry',
     'initialize_agents',
     'get_agent_configurations',
     'get_department_agents'
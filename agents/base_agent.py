@@ -1,68 +1,417 @@
-from langchain_openai import ChatOpenAI
-from langchain.prompts import ChatPromptTemplate
+from langchain_core.prompts import ChatPromptTemplate
 from langchain_core.runnables import RunnableSequence
-from typing import Dict, Any, Optional
-import json
+from types import MappingProxyType
+from typing import Dict, Any, Mapping, Optional, Tuple
+import asyncio
+import hashlib
 import os
+import time
 from config.settings import get_settings
+from utils.cache import CacheBackend, MemoryCache, build_cache, make_cache_key
+from utils.llm_client import get_chat_model, get_llm_semaphore
+from utils.metrics import (
+    AGENT_ERRORS,
+    CIRCUIT_BREAKER_OPEN,
+    JSON_PARSE_RESULTS,
+    LLM_CALL_LATENCY,
+    LLM_HEDGES,
+    LLM_RETRIES,
+    LLM_TIMEOUTS,
+    LLM_TOKENS,
+    RATE_LIMIT_WAIT
+)
+from utils.json_parser import ParseResult, parse_json_output
+from utils.rate_limiter import get_rate_limiter
+from utils.tokens import count_message_tokens, count_tokens, get_token_usage
+from utils.resilience import (
+    CircuitBreaker,
+    get_circuit_breaker,
+    get_latency_tracker,
+    hedged,
+    is_retryable,
+    run_with_timeout,
+    with_retries
+)
+from utils.exceptions import TimeoutException, TokenBudgetExceededException
 
 settings = get_settings()
 
+DEFAULT_CHAIN = "default"
+
+_agent_cache: Optional[CacheBackend] = None
+_agent_cache_configured = False
+
+def get_agent_cache() -> Optional[CacheBackend]:
+    """Return the process-wide agent call cache built from settings"""
+    global _agent_cache, _agent_cache_configured
+    if not _agent_cache_configured:
+        backend = settings.AGENT_CACHE_BACKEND.lower()
+        if backend == "memory":
+            _agent_cache = MemoryCache(
+                max_size=settings.AGENT_CACHE_MAX_SIZE,
+                ttl_seconds=settings.AGENT_CACHE_TTL_SECONDS
+            )
+        elif backend == "sqlite":
+            _agent_cache = build_cache(
+                max_size=settings.AGENT_CACHE_MAX_SIZE,
+                ttl_seconds=settings.AGENT_CACHE_TTL_SECONDS,
+                sqlite_path=settings.AGENT_CACHE_SQLITE_PATH,
+                table="agent_calls"
+            )
+        elif backend != "none":
+            raise ValueError(f"Unknown AGENT_CACHE_BACKEND: {settings.AGENT_CACHE_BACKEND}")
+        _agent_cache_configured = True
+    return _agent_cache
+
+def set_agent_cache(cache: Optional[CacheBackend]) -> None:
+    """Plug in a custom agent call cache, or None to disable caching"""
+    global _agent_cache, _agent_cache_configured
+    _agent_cache = cache
+    _agent_cache_configured = True
+
+def get_agent_cache_stats() -> Dict[str, Any]:
+    """Return hit/miss counters of the agent call cache"""
+    cache = get_agent_cache()
+    return cache.stats() if cache is not None else {"backend": "none"}
+
 class BaseAgent:
     def __init__(
         self,
         role_description: Optional[str] = None
     ):
-        openai_config = settings.get_openai_config()
         api_key = os.getenv("OPENAI_API_KEY")
         if not api_key:
             raise ValueError("OPENAI_API_KEY environment variable is not set!")
-            
-        self.llm = ChatOpenAI(
-            openai_api_key=api_key,
-            model_name=openai_config["model"],
-            temperature=openai_config["temperature"],
-            max_tokens=openai_config["max_tokens"],
-            frequency_penalty=openai_config["frequency_penalty"],
-            presence_penalty=openai_config["presence_penalty"],
-            top_p=openai_config["top_p"]
-        )
-        self.chain = None
+
+        # Borrow the shared model so all agents reuse one connection pool
+        self.llm = get_chat_model(api_key)
         self.role_description = role_description
+        self.cache = get_agent_cache()
+        self._chains: Dict[str, RunnableSequence] = {}
+        self._prompts: Dict[str, ChatPromptTemplate] = {}
+        self._template_hashes: Dict[str, str] = {}
 
-    def setup_chain(self, prompt_template: str) -> None:
-        """Set up the processing chain with the given prompt template"""
+    @property
+    def chains(self) -> Mapping[str, RunnableSequence]:
+        """Read-only view of the compiled chains, keyed by chain name"""
+        return MappingProxyType(self._chains)
+
+    @property
+    def chain(self) -> Optional[RunnableSequence]:
+        """The default chain used when process is called without a chain name"""
+        return self._chains.get(DEFAULT_CHAIN)
+
+    def add_chain(self, name: str, prompt_template: str) -> None:
+        """
+        Compile a named chain from a prompt template.
+
+        Chains are meant to be built once while the agent is constructed; they
+        are never swapped per request, so concurrent requests can safely share
+        the agent.
+        """
         if self.role_description:
             prompt_template = f"{self.role_description}\n\n{prompt_template}"
-            
+
         prompt = ChatPromptTemplate.from_template(prompt_template)
-        self.chain = prompt | self.llm
+        self._prompts[name] = prompt
+        self._chains[name] = prompt | self.llm
+        self._template_hashes[name] = hashlib.sha256(prompt_template.encode("utf-8")).hexdigest()
 
-    async def _validate_json_response(self, response: str) -> Dict[str, Any]:
-        """Validate and parse JSON response"""
-        try:
-            return json.loads(response)
-        except json.JSONDecodeError:
+    def setup_chain(self, prompt_template: str) -> None:
+        """Set up the processing chain with the given prompt template"""
+        self.add_chain(DEFAULT_CHAIN, prompt_template)
+
+    def _cache_key(self, chain_name: str, request: Dict[str, Any]) -> str:
+        """Key a call by agent class, prompt template and rendered inputs"""
+        return make_cache_key(
+            type(self).__name__,
+            self._template_hashes[chain_name],
+            request,
+            settings.get_openai_config()
+        )
+
+    def _count_prompt_tokens(self, chain_name: str, request: Dict[str, Any]) -> int:
+        """Count the tokens of the rendered prompt for a call"""
+        messages = self._prompts[chain_name].format_messages(**request)
+        return count_message_tokens(messages, settings.OPENAI_MODEL_NAME)
+
+    def estimate_tokens(self, request: Dict[str, Any], chain_name: str = DEFAULT_CHAIN) -> int:
+        """Most tokens a call can spend: its prompt plus a full max_tokens completion"""
+        return self._count_prompt_tokens(chain_name, request) + settings.OPENAI_MAX_TOKENS
+
+    def fits_token_budget(self, chain_name: str, request: Dict[str, Any]) -> bool:
+        """Whether a call with the minimum useful completion fits the remaining budget"""
+        usage = get_token_usage()
+        if usage is None or usage.budget is None:
+            return True
+        required = self._count_prompt_tokens(chain_name, request) + settings.TOKEN_BUDGET_MIN_COMPLETION_TOKENS
+        return required <= usage.remaining
+
+    def _admit(self, chain_name: str, request: Dict[str, Any]) -> Tuple[RunnableSequence, int, int]:
+        """
+        Count the prompt tokens of a call and fit it into the request's token budget.
+
+        Returns the chain to run, the prompt token estimate and the number of
+        tokens reserved against the budget. In "degrade" mode a call gets its
+        share of the remaining budget (see TokenUsage.claim_share), with
+        max_tokens lowered when the full completion would not fit in it; in
+        "reject" mode it may use whatever remains. Calls that cannot fit are
+        refused with TokenBudgetExceededException.
+        """
+        prompt = self._prompts[chain_name]
+        prompt_tokens = self._count_prompt_tokens(chain_name, request)
+        chain = self._chains[chain_name]
+
+        usage = get_token_usage()
+        if usage is None or usage.budget is None:
+            return chain, prompt_tokens, 0
+
+        degrade = settings.TOKEN_BUDGET_MODE == "degrade"
+        required = prompt_tokens + settings.OPENAI_MAX_TOKENS
+        available = usage.claim_share() if degrade else usage.remaining
+        if required <= available:
+            usage.reserve(required)
+            return chain, prompt_tokens, required
+
+        allowance = available - prompt_tokens
+        if degrade and allowance >= settings.TOKEN_BUDGET_MIN_COMPLETION_TOKENS:
+            usage.reserve(available)
+            return prompt | self.llm.bind(max_tokens=allowance), prompt_tokens, available
+
+        raise TokenBudgetExceededException(type(self).__name__, required, available)
+
+    @staticmethod
+    def _reported_usage(response: Any, content: str, prompt_estimate: int) -> Tuple[int, int]:
+        """Prompt and completion tokens of a response, preferring provider-reported usage"""
+        reported = getattr(response, "usage_metadata", None) or {}
+        prompt_tokens = reported.get("input_tokens") or prompt_estimate
+        completion_tokens = reported.get("output_tokens") or count_tokens(content, settings.OPENAI_MODEL_NAME)
+        return prompt_tokens, completion_tokens
+
+    @staticmethod
+    def _hit_token_limit(response: Any) -> bool:
+        """Whether the model stopped because it ran out of max_tokens"""
+        metadata = getattr(response, "response_metadata", None) or {}
+        return metadata.get("finish_reason") == "length"
+
+    def _record_usage(self, response: Any, content: str, prompt_estimate: int) -> None:
+        """Account the tokens of a finished call in the metrics and the request's ledger"""
+        prompt_tokens, completion_tokens = self._reported_usage(response, content, prompt_estimate)
+
+        agent_name = type(self).__name__
+        LLM_TOKENS.inc(prompt_tokens, agent=agent_name, type="prompt")
+        LLM_TOKENS.inc(completion_tokens, agent=agent_name, type="completion")
+        usage = get_token_usage()
+        if usage is not None:
+            usage.record(agent_name, prompt_tokens, completion_tokens)
+
+    def _hedge_delay(self, site: str) -> Optional[float]:
+        """
+        Seconds to wait before firing a duplicate call, or None to not hedge.
+
+        Hedging starts once enough calls have been observed for a stable
+        percentile. Budgeted requests are never hedged, since the duplicate
+        would spend tokens outside the reservation.
+        """
+        if not settings.LLM_HEDGING_ENABLED:
+            return None
+        usage = get_token_usage()
+        if usage is not None and usage.budget is not None:
+            return None
+        tracker = get_latency_tracker()
+        if tracker.count(site) < settings.LLM_HEDGE_MIN_SAMPLES:
+            return None
+        delay = tracker.percentile(site, settings.LLM_HEDGE_PERCENTILE)
+        return max(delay, settings.LLM_HEDGE_MIN_DELAY_SECONDS)
+
+    @property
+    def circuit_breaker(self) -> CircuitBreaker:
+        """Breaker shared by every instance of this agent class on the configured model"""
+        return get_circuit_breaker(
+            f"{type(self).__name__}:{settings.OPENAI_MODEL_NAME}",
+            failure_threshold=settings.CIRCUIT_BREAKER_FAILURE_THRESHOLD,
+            reset_seconds=settings.CIRCUIT_BREAKER_RESET_SECONDS
+        )
+
+    async def _invoke(
+        self,
+        chain: RunnableSequence,
+        chain_name: str,
+        request: Dict[str, Any],
+        prompt_tokens: int
+    ) -> Any:
+        """
+        Invoke a chain behind the agent's circuit breaker and deadline.
+
+        Every attempt first waits for the model's rate limiter, admitted on
+        the prompt estimate plus max_tokens and reconciled against the
+        reported usage, and for an LLM concurrency slot. The first attempt
+        is admitted before the deadline starts, so local queueing is never
+        mistaken for a slow upstream. Transient upstream errors are retried
+        with jittered exponential backoff, and slow calls are hedged when
+        enabled. Only upstream timeouts and retryable errors count against
+        the breaker.
+        """
+        agent_name = type(self).__name__
+        site = f"{agent_name}.{chain_name}"
+        timeout = settings.get_agent_timeout(agent_name)
+        breaker = self.circuit_breaker
+        model = settings.OPENAI_MODEL_NAME
+        limiter = get_rate_limiter(model)
+        semaphore = get_llm_semaphore()
+        estimated_tokens = prompt_tokens + settings.OPENAI_MAX_TOKENS
+        # Attempts waiting for admission and attempts calling the model, to attribute timeouts
+        waiting = 0
+        calling = 0
+
+        async def admit() -> None:
+            if limiter is not None:
+                RATE_LIMIT_WAIT.observe(await limiter.acquire(estimated_tokens), model=model)
+            try:
+                await semaphore.acquire()
+            except BaseException:
+                if limiter is not None:
+                    limiter.reconcile(estimated_tokens, 0)
+                raise
+
+        preadmitted = False
+
+        async def attempt() -> Any:
+            nonlocal preadmitted, waiting, calling
+            # The counters are left raised when the deadline cancels an attempt,
+            # since they are read only after the cancelled attempts have unwound
+            if preadmitted:
+                preadmitted = False
+            else:
+                # Retries and hedges queue inside the deadline
+                waiting += 1
+                await admit()
+                waiting -= 1
+            calling += 1
             try:
-                json_start = response.find('{')
-                json_end = response.rfind('}') + 1
-                if json_start >= 0 and json_end > json_start:
-                    json_str = response[json_start:json_end]
-                    return json.loads(json_str)
-            except:
-                return {"error": "Invalid JSON response", "raw_response": response}
-
-    async def process(self, request: Dict[str, Any]) -> Dict[str, Any]:
-        """Process the request and return response"""
-        if not self.chain:
-            raise ValueError("Chain not initialized. Call setup_chain first.")
-        
+                response = await chain.ainvoke(request)
+            except Exception:
+                # Rejected calls are not billed against the token limit
+                if limiter is not None:
+                    limiter.reconcile(estimated_tokens, 0)
+                calling -= 1
+                raise
+            finally:
+                semaphore.release()
+            calling -= 1
+            if limiter is not None:
+                content = response.content if hasattr(response, 'content') else str(response)
+                limiter.reconcile(estimated_tokens, sum(self._reported_usage(response, content, prompt_tokens)))
+            return response
+
+        async def attempt_with_retries() -> Any:
+            return await with_retries(
+                attempt,
+                attempts=settings.LLM_RETRY_ATTEMPTS,
+                initial_wait=settings.LLM_RETRY_INITIAL_WAIT,
+                max_wait=settings.LLM_RETRY_MAX_WAIT,
+                on_retry=lambda retry_state: LLM_RETRIES.inc(agent=agent_name)
+            )
+
+        breaker.before_call()
         try:
-            response = await self.chain.ainvoke(request)
+            await admit()
+        except BaseException:
+            breaker.release()
+            raise
+        preadmitted = True
+
+        call = hedged(
+            attempt_with_retries,
+            self._hedge_delay(site),
+            on_hedge=lambda: LLM_HEDGES.inc(agent=agent_name)
+        )
+        start = time.perf_counter()
+        try:
+            with LLM_CALL_LATENCY.time(agent=agent_name):
+                response = await run_with_timeout(
+                    call,
+                    timeout,
+                    lambda: TimeoutException(f"{agent_name} LLM call", timeout)
+                )
+        except TimeoutException:
+            LLM_TIMEOUTS.inc(agent=agent_name)
+            if waiting and not calling:
+                # Every live attempt was still queueing locally
+                breaker.release()
+            else:
+                breaker.record_failure()
+            raise
+        except asyncio.CancelledError:
+            breaker.release()
+            raise
+        except Exception as e:
+            if is_retryable(e):
+                breaker.record_failure()
+            else:
+                breaker.release()
+            raise
+        else:
+            breaker.record_success()
+        finally:
+            if preadmitted:
+                # The first attempt never started, e.g. cancelled straight away
+                semaphore.release()
+                if limiter is not None:
+                    limiter.reconcile(estimated_tokens, 0)
+            CIRCUIT_BREAKER_OPEN.set(int(breaker.state != CircuitBreaker.CLOSED), breaker=breaker.name)
+        get_latency_tracker().observe(site, time.perf_counter() - start)
+        return response
+
+    async def _validate_json_response(self, response: str) -> ParseResult:
+        """Parse the JSON response and count how it was parsed"""
+        parsed = parse_json_output(response)
+        JSON_PARSE_RESULTS.inc(agent=type(self).__name__, outcome=parsed.outcome)
+        return parsed
+
+    async def process(
+        self,
+        request: Dict[str, Any],
+        chain_name: str = DEFAULT_CHAIN
+    ) -> Dict[str, Any]:
+        """Process the request with the named chain and return response"""
+        chain = self._chains.get(chain_name)
+        if not chain:
+            raise ValueError(f"Chain '{chain_name}' not initialized. Call setup_chain first.")
+
+        cache_key = self._cache_key(chain_name, request) if self.cache is not None else None
+        if cache_key:
+            cached = await self.cache.aget(cache_key)
+            if cached is not None:
+                return cached
+
+        agent_name = type(self).__name__
+        chain, prompt_tokens, reserved = self._admit(chain_name, request)
+        lowered = chain is not self._chains[chain_name]
+        try:
+            response = await self._invoke(chain, chain_name, request, prompt_tokens)
             content = response.content if hasattr(response, 'content') else str(response)
-            return await self._validate_json_response(content)
+            self._record_usage(response, content, prompt_tokens)
+            parsed = await self._validate_json_response(content)
+            result = parsed.value if parsed.ok else parsed.as_error()
+            # A lowered max_tokens only degrades the output if the completion ran into it
+            degraded = lowered and (self._hit_token_limit(response) or parsed.truncated)
+            if degraded:
+                get_token_usage().degrade(f"{agent_name}: output cut off by the token budget")
         except Exception as e:
+            AGENT_ERRORS.inc(agent=agent_name)
             return {
                 "error": f"Processing failed: {str(e)}",
                 "status": "failed"
-            }
\ No newline at end of file
+            }
+        finally:
+            usage = get_token_usage()
+            if reserved and usage is not None:
+                usage.release(reserved)
+
+        if not isinstance(result, dict) or "error" in result:
+            AGENT_ERRORS.inc(agent=agent_name)
+        elif cache_key and not degraded and not parsed.truncated:
+            # Output closed up after truncation may be missing fields, so the call is retried next time
+            await self.cache.aset(cache_key, result)
+        return result
@@ -1,25 +1,12 @@
 from .base_agent import BaseAgent
 from typing import Dict, Any
 
-class CEOAgent(BaseAgent):
-    def __init__(self):
-        role_description = """You are a CEO of a marketing agency responsible for analyzing requests, 
-        determining required departments, and creating comprehensive marketing plans."""
-        super().__init__(role_description=role_description)
-
-    async def determine_required_departments(self, request: str) -> Dict[str, Any]:
-        """Analyze request and determine required departments"""
-        prompt_template = """
+# AVAILABLE_DEPARTMENTS is substituted when the chain is built, before prompt formatting
+DEPARTMENT_SELECTION_PROMPT = """
         Analyze the following marketing request and determine which departments should be involved.
         
         Available departments:
-        - seo: SEO Manager for search optimization and keyword strategy
-        - content: Content Marketing Manager for content creation and strategy
-        - strategy: Digital Strategy Manager for overall marketing strategy
-        - advertising: Advertising Manager for paid campaigns
-        - social: Social Media Manager for social media strategy
-        - email: Email Marketing Manager for email campaigns
-        - analytics: Analytics Manager for tracking and reporting
+AVAILABLE_DEPARTMENTS
         
         Request: {request}
         
@@ -41,12 +28,8 @@ class CEOAgent(BaseAgent):
             }}
         }}
         """
-        self.setup_chain(prompt_template)
-        return await self.process({"request": request})
 
-    async def create_final_response(self, data: Dict[str, Any]) -> Dict[str, Any]:
-        """Create final response from summarized data"""
-        prompt_template = """
+FINAL_RESPONSE_PROMPT = """
         Create a comprehensive final marketing plan based on the following information.
         
         Original Request: {original_request}
@@ -106,5 +89,29 @@ class CEOAgent(BaseAgent):
         
         Ensure the response is actionable, measurable, and aligns with the department strategies provided.
         """
-        self.setup_chain(prompt_template)
-        return await self.process(data)
\ No newline at end of file
+
+def format_departments(departments: Dict[str, str]) -> str:
+    """Render the department list of the selection prompt"""
+    return "\n".join(f"        - {code}: {hint}" for code, hint in departments.items())
+
+class CEOAgent(BaseAgent):
+    def __init__(self, departments: Dict[str, str]):
+        role_description = """You are a CEO of a marketing agency responsible for analyzing requests, 
+        determining required departments, and creating comprehensive marketing plans."""
+        super().__init__(role_description=role_description)
+        # Department code -> routing hint shown to the CEO, as listed by the ontology
+        self.departments = dict(departments)
+        # Compile every chain once; requests only select them by name
+        self.add_chain(
+            "select_departments",
+            DEPARTMENT_SELECTION_PROMPT.replace("AVAILABLE_DEPARTMENTS", format_departments(self.departments))
+        )
+        self.add_chain("final_response", FINAL_RESPONSE_PROMPT)
+
+    async def determine_required_departments(self, request: str) -> Dict[str, Any]:
+        """Analyze request and determine required departments"""
+        return await self.process({"request": request}, chain_name="select_departments")
+
+    async def create_final_response(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        """Create final response from summarized data"""
+        return await self.process(data, chain_name="final_response")
\ No newline at end of file
@@ -0,0 +1,137 @@
+from collections.abc import Mapping
+from functools import lru_cache
+from importlib import import_module
+from typing import Any, Dict, Iterator, List, Optional
+import threading
+
+from config.settings import get_settings
+from utils.owl_reader import DEFAULT_ONTOLOGY_PATH, OWLReader, get_owl_reader
+
+settings = get_settings()
+
+ORCHESTRATOR = "CEOAgent"
+SUMMARIZER = "SummarizerAgent"
+
+
+class AgentSpec:
+    """An agent as described by the ontology"""
+    __slots__ = ("name", "code", "implementation", "description", "routing_hint", "responsibilities")
+
+    def __init__(self, name: str, details: Dict[str, Any]):
+        self.name = name
+        self.code = details["code"]
+        self.implementation = details["implementation"]
+        self.description = details.get("description")
+        self.routing_hint = details.get("routing_hint") or details.get("description") or name
+        self.responsibilities = details.get("responsibilities", [])
+
+    def load_class(self) -> type:
+        """Import the agent class named by ma:implementation"""
+        module_name, _, class_name = self.implementation.rpartition(".")
+        return getattr(import_module(module_name), class_name)
+
+
+class AgentRegistry:
+    """
+    Agents defined by the ontology, instantiated lazily on first use.
+
+    Every ontology class with ma:code and ma:implementation is registered
+    under its code. Departments are the agents the orchestrator delegates
+    to, so adding one only takes an ontology entry and its class.
+    """
+    def __init__(self, reader: OWLReader):
+        self._specs: Dict[str, AgentSpec] = {}
+        self._codes_by_name: Dict[str, str] = {}
+        for name in reader.agent_names():
+            details = reader.get_agent_details(name)
+            if details.get("code") and details.get("implementation"):
+                spec = AgentSpec(name, details)
+                self._specs[spec.code] = spec
+                self._codes_by_name[name] = spec.code
+
+        delegates = reader.get_delegation_chain().get(ORCHESTRATOR, [])
+        # Kept in ontology order, which is the order the CEO prompt lists departments in
+        self.department_codes: List[str] = [
+            self._codes_by_name[name] for name in delegates if name in self._codes_by_name
+        ]
+        self.orchestrator_code = self._codes_by_name.get(ORCHESTRATOR)
+        self.summarizer_code = self._codes_by_name.get(SUMMARIZER)
+        self._agents: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+
+    def __contains__(self, code: str) -> bool:
+        return code in self._specs
+
+    def spec(self, code: str) -> AgentSpec:
+        if code not in self._specs:
+            raise KeyError(f"Unknown agent '{code}'")
+        return self._specs[code]
+
+    def specs(self) -> List[AgentSpec]:
+        """Every registered agent: orchestrator, summarizer, then departments in delegation order"""
+        codes = [code for code in (self.orchestrator_code, self.summarizer_code) if code]
+        codes += [code for code in self.department_codes if code not in codes]
+        codes += sorted(code for code in self._specs if code not in codes)
+        return [self._specs[code] for code in codes]
+
+    def routing_hints(self) -> Dict[str, str]:
+        """Department code -> routing hint, in the order the CEO prompt lists them"""
+        return {code: self._specs[code].routing_hint for code in self.department_codes}
+
+    def _init_kwargs(self, spec: AgentSpec) -> Dict[str, Any]:
+        if spec.name == ORCHESTRATOR:
+            return {"departments": self.routing_hints()}
+        return {}
+
+    def get(self, code: str) -> Any:
+        """Return the agent registered under code, constructing it on first use"""
+        agent = self._agents.get(code)
+        if agent is not None:
+            return agent
+        spec = self.spec(code)
+        with self._lock:
+            if code not in self._agents:
+                self._agents[code] = spec.load_class()(**self._init_kwargs(spec))
+            return self._agents[code]
+
+    def is_loaded(self, code: str) -> bool:
+        return code in self._agents
+
+    def departments(self) -> "LazyAgents":
+        """Department agents by code, each built the first time it is looked up"""
+        return LazyAgents(self, self.department_codes)
+
+    def all(self) -> Dict[str, Any]:
+        """Construct and return every registered agent"""
+        return {spec.code: self.get(spec.code) for spec in self.specs()}
+
+
+class LazyAgents(Mapping):
+    """Read-only mapping of agent codes to agents that defers construction to lookup"""
+    def __init__(self, registry: AgentRegistry, codes: List[str]):
+        self._registry = registry
+        self._codes = list(codes)
+
+    def __getitem__(self, code: str) -> Any:
+        if code not in self._codes:
+            raise KeyError(code)
+        return self._registry.get(code)
+
+    def __contains__(self, code: object) -> bool:
+        return code in self._codes
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._codes)
+
+    def __len__(self) -> int:
+        return len(self._codes)
+
+
+@lru_cache(maxsize=None)
+def _registry_for(ontology_path: str) -> AgentRegistry:
+    return AgentRegistry(get_owl_reader(ontology_path))
+
+
+def get_agent_registry(ontology_path: Optional[str] = None) -> AgentRegistry:
+    """Return the shared registry for the configured ontology"""
+    return _registry_for(ontology_path or settings.ONTOLOGY_PATH or DEFAULT_ONTOLOGY_PATH)
@@ -1,5 +1,28 @@
-from typing import Dict, Any
+from typing import Dict, Any, List, Tuple
 from .base_agent import BaseAgent
+from config.settings import get_settings
+from utils.tokens import count_tokens
+from utils.serialization import dumps_str
+
+settings = get_settings()
+
+# Limits applied to low-priority department responses when trimming
+TRIMMED_LIST_ITEMS = 3
+TRIMMED_STRING_CHARS = 300
+
+def compact_json(data: Any) -> str:
+    """Serialize to canonical minified JSON for prompt input"""
+    return dumps_str(data, sort_keys=True)
+
+def _shorten(value: Any) -> Any:
+    """Recursively cap list lengths and string sizes"""
+    if isinstance(value, dict):
+        return {k: _shorten(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_shorten(v) for v in value[:TRIMMED_LIST_ITEMS]]
+    if isinstance(value, str) and len(value) > TRIMMED_STRING_CHARS:
+        return value[:TRIMMED_STRING_CHARS] + "..."
+    return value
 
 class SummarizerAgent(BaseAgent):
     def __init__(self):
@@ -64,6 +87,56 @@ class SummarizerAgent(BaseAgent):
         super().__init__(role_description=role_description)
         self.setup_chain(prompt_template)
 
+    def _fits(self, responses: Dict[str, Any], selected: Dict[str, Any], budget: int) -> bool:
+        text = compact_json(responses) + compact_json(selected)
+        return count_tokens(text, settings.OPENAI_MODEL_NAME) <= budget
+
+    def prepare_input(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Render department outputs as compact JSON that fits the input token budget.
+
+        When over budget, trimming proceeds from least to most important:
+        CEO justifications and context are dropped, then responses of the
+        lowest-priority departments are shortened, then omitted. The
+        highest-priority department is never omitted.
+        """
+        responses = dict(data.get("responses", {}))
+        selected = dict(data.get("selected_departments", {}))
+        budget = settings.SUMMARIZER_INPUT_TOKEN_BUDGET
+
+        def priority(department: str) -> int:
+            try:
+                return int(selected.get(department, {}).get("priority", 5))
+            except (TypeError, ValueError, AttributeError):
+                return 5
+
+        # Lowest priority (largest number) first
+        trim_order: List[str] = sorted(responses, key=priority, reverse=True)
+        steps: List[Tuple[str, str]] = (
+            [("brief", "")]
+            + [("shorten", department) for department in trim_order]
+            + [("omit", department) for department in trim_order[:-1]]
+        )
+
+        for step, department in steps:
+            if budget <= 0 or self._fits(responses, selected, budget):
+                break
+            if step == "brief":
+                selected = {
+                    k: {"task": v.get("task"), "priority": v.get("priority")} if isinstance(v, dict) else v
+                    for k, v in selected.items()
+                }
+            elif step == "shorten":
+                responses[department] = _shorten(responses[department])
+            else:
+                responses[department] = {"omitted": "trimmed to fit the summarizer input budget"}
+
+        return {
+            "original_request": data["original_request"],
+            "responses": compact_json(responses),
+            "selected_departments": compact_json(selected)
+        }
+
     async def compile_responses(self, data: Dict[str, Any]) -> Dict[str, Any]:
         """Compile and integrate responses from all departments"""
-        return await self.process(data)
\ No newline at end of file
+        return await self.process(self.prepare_input(data))
\ No newline at end of file
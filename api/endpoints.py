@@ -1,17 +1,39 @@
-from fastapi import FastAPI, HTTPException, BackgroundTasks, Response
-from typing import Dict, Any
+from fastapi import FastAPI, HTTPException, BackgroundTasks, Query, Response
+from fastapi.responses import StreamingResponse
+from typing import Dict, Any, AsyncIterator, List, Optional
+import asyncio
 from datetime import datetime, UTC
 import os
 from dotenv import load_dotenv
-import json
-from contextlib import asynccontextmanager
+from contextlib import AsyncExitStack, asynccontextmanager
 
 # Import models and agents
-from models.pydantic_models import MarketingRequest
-from agents import initialize_agents, get_department_agents
-from agents.summarizer_agent import SummarizerAgent
-from workflow.langgraph_workflow import create_marketing_workflow, execute_workflow
+from models.pydantic_models import MarketingRequest, BatchMarketingRequest
+from agents import get_agent_registry
+from workflow.langgraph_workflow import (
+    create_marketing_workflow,
+    execute_workflow,
+    open_checkpointer,
+    resume_workflow,
+    stream_workflow,
+    get_result_cache,
+    workflow_cache_key
+)
+from workflow.job_queue import JobQueue
+from utils.exceptions import (
+    CheckpointNotFoundException,
+    JobQueueFullException,
+    RequestConflictException,
+    TokenBudgetExceededException
+)
 from config.settings import get_settings
+from utils.llm_client import close_llm_clients
+from utils.cache import make_cache_key
+from utils.metrics import WORKFLOW_REQUESTS, registry as metrics_registry
+from utils.resilience import circuit_breaker_stats, get_latency_tracker
+from utils.rate_limiter import rate_limiter_stats
+from utils.serialization import dumps, dumps_str
+from utils.single_flight import SingleFlight
 from utils.logger import logger  # Custom logger
 
 # Load environment variables
@@ -20,8 +42,47 @@ load_dotenv()
 # Get settings
 settings = get_settings()
 
-# Global variable for workflow
+# Global variables for workflow and background jobs
 marketing_workflow = None
+job_queue = None
+in_flight_workflows = SingleFlight()
+
+async def run_workflow(request: MarketingRequest) -> Dict[str, Any]:
+    """
+    Run a request through the workflow, sharing the run with identical requests in flight.
+
+    Requests coalesce when their normalized prompt, response depth and
+    token budget match; every caller gets the same result and shapes it
+    into a response carrying its own request_id. With checkpointing on,
+    every request runs on its own so each request_id gets a checkpoint to
+    replay or resume from.
+    """
+    async def run() -> Dict[str, Any]:
+        return await execute_workflow(
+            workflow=marketing_workflow,
+            request_id=request.request_id,
+            prompt=request.prompt,
+            response_depth=request.response_depth,
+            token_budget=request.token_budget
+        )
+
+    if not settings.SINGLE_FLIGHT_ENABLED or getattr(marketing_workflow, "checkpointer", None) is not None:
+        return await run()
+
+    key = make_cache_key(
+        workflow_cache_key(request.prompt, request.response_depth),
+        request.token_budget or settings.TOKEN_BUDGET_DEFAULT
+    )
+    result, shared = await in_flight_workflows.do(key, run)
+    if shared:
+        WORKFLOW_REQUESTS.inc(status="coalesced")
+        logger.log_workflow_step(request.request_id, "coalesced")
+    return result
+
+async def run_job(request: MarketingRequest) -> Dict[str, Any]:
+    """Run a queued request through the workflow, returning the public response payload"""
+    result = await run_workflow(request)
+    return build_strategy_response(request.request_id, result)
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
@@ -31,27 +92,48 @@ async def lifespan(app: FastAPI):
     """
     # Startup
     logger.logger.info("Starting Marketing Strategy API...")
+    resources = AsyncExitStack()
     try:
-        # Initialize all agents
-        all_agents = initialize_agents()
-        ceo_agent = all_agents["ceo"]
-        summarizer_agent = all_agents["summarizer"]
-        department_agents = get_department_agents()
+        checkpointer = None
+        if settings.CHECKPOINTING_ENABLED:
+            checkpointer = await resources.enter_async_context(open_checkpointer())
+            logger.logger.info(f"Checkpointing workflows to {settings.CHECKPOINT_DB_PATH}")
+
+        # Agents come from the ontology; departments are constructed on first use
+        registry = get_agent_registry()
+        ceo_agent = registry.get(registry.orchestrator_code)
+        summarizer_agent = registry.get(registry.summarizer_code)
+        department_agents = registry.departments()
         
         # Create workflow and assign to global variable
         global marketing_workflow
         marketing_workflow = create_marketing_workflow(
             ceo_agent=ceo_agent,
             department_agents=department_agents,
-            summarizer_agent=summarizer_agent
+            summarizer_agent=summarizer_agent,
+            checkpointer=checkpointer
         )
         logger.logger.info("Successfully initialized all agents and workflow")
+
+        global job_queue
+        job_queue = JobQueue(
+            runner=run_job,
+            workers=settings.JOB_WORKERS,
+            max_queue_size=settings.JOB_QUEUE_MAX_SIZE,
+            result_ttl_seconds=settings.JOB_RESULT_TTL_SECONDS
+        )
+        await job_queue.start()
     except Exception as e:
         logger.logger.error(f"Error initializing agents: {str(e)}")
+        await resources.aclose()
         raise
     yield
     # Shutdown
     logger.logger.info("Shutting down Marketing Strategy API...")
+    if job_queue is not None:
+        await job_queue.stop()
+    await close_llm_clients()
+    await resources.aclose()
 
 # Initialize FastAPI app
 app = FastAPI(
@@ -63,6 +145,38 @@ app = FastAPI(
     lifespan=lifespan
 )
 
+class ORJSONResponse(Response):
+    """JSON response rendered with the shared orjson serializer"""
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+def build_strategy_response(request_id: str, result: Dict[str, Any]) -> Dict[str, Any]:
+    """Shape a workflow result into the public response payload"""
+    response_data = {
+        "request_id": request_id,
+        "timestamp": datetime.now(UTC).isoformat(),
+        "status": result["status"],
+        "marketing_strategy": result["summary"],            # Include the summary
+        "department_details": result["department_responses"] # Include department details
+    }
+    if "final_report" in result:
+        response_data["final_report"] = result["final_report"]
+    if "token_usage" in result:
+        response_data["token_usage"] = result["token_usage"]
+    return response_data
+
+def build_error_response(request_id: str, error_msg: str) -> Dict[str, Any]:
+    """Shape a failure into the public error payload"""
+    return {
+        "error": error_msg,
+        "request_id": request_id,
+        "timestamp": datetime.now(UTC).isoformat(),
+        "status": "error",
+        "message": "Failed to generate marketing strategy. Please try again."
+    }
+
 @app.post(
     "/marketing-strategy",
     tags=["Marketing"],
@@ -90,27 +204,33 @@ async def generate_marketing_strategy(
             )
 
         # Execute workflow
-        result = await execute_workflow(
-            workflow=marketing_workflow,
-            request_id=request.request_id,
-            prompt=request.prompt
-        )
+        result = await run_workflow(request)
 
         # Log success
         logger.log_workflow_step(request.request_id, "complete", {"status": "success"})
 
         # Create success response with complete data
-        response_data = {
-            "request_id": request.request_id,
-            "timestamp": datetime.now(UTC).isoformat(),
-            "status": result["status"],
-            "marketing_strategy": result["summary"],            # Include the summary
-            "department_details": result["department_responses"] # Include department details
-        }
+        response_data = build_strategy_response(request.request_id, result)
+
+        return ORJSONResponse(content=response_data)
+
+    except TokenBudgetExceededException as e:
+        # The request could not be completed within its token budget
+        error_msg = f"Token budget exceeded: {e.message}"
+        logger.log_error(request.request_id, error_msg)
 
-        return Response(
-            content=json.dumps(response_data, ensure_ascii=False),
-            media_type="application/json"
+        return ORJSONResponse(
+            content=build_error_response(request.request_id, error_msg),
+            status_code=422
+        )
+
+    except RequestConflictException as e:
+        # The request_id was already used for a different prompt
+        logger.log_error(request.request_id, e.message)
+
+        return ORJSONResponse(
+            content=build_error_response(request.request_id, e.message),
+            status_code=409
         )
 
     except Exception as e:
@@ -119,21 +239,201 @@ async def generate_marketing_strategy(
         logger.log_error(request.request_id, error_msg)
 
         # Create error response
-        error_response = {
-            "error": error_msg,
-            "request_id": request.request_id,
+        error_response = build_error_response(request.request_id, error_msg)
+
+        return ORJSONResponse(
+            content=error_response,
+            status_code=500
+        )
+
+@app.post(
+    "/marketing-strategy/{request_id}/resume",
+    tags=["Marketing"],
+    summary="Resume marketing strategy",
+    description="Resume a failed request from its checkpoint, re-running only the steps that did not complete"
+)
+async def resume_marketing_strategy(
+    request_id: str,
+    token_budget: Optional[int] = Query(default=None, ge=1)
+) -> Response:
+    if marketing_workflow is None:
+        raise HTTPException(
+            status_code=503,
+            detail="Service is initializing. Please try again in a moment."
+        )
+
+    try:
+        logger.log_workflow_step(request_id, "resume_requested")
+        # Concurrent resumes of one request would race on its checkpoint
+        result, _ = await in_flight_workflows.do(
+            make_cache_key("resume", request_id),
+            lambda: resume_workflow(marketing_workflow, request_id, token_budget=token_budget)
+        )
+        logger.log_workflow_step(request_id, "complete", {"status": "success"})
+        return ORJSONResponse(content=build_strategy_response(request_id, result))
+
+    except CheckpointNotFoundException as e:
+        logger.log_error(request_id, e.message)
+        return ORJSONResponse(
+            content=build_error_response(request_id, e.message),
+            status_code=404
+        )
+
+    except TokenBudgetExceededException as e:
+        error_msg = f"Token budget exceeded: {e.message}"
+        logger.log_error(request_id, error_msg)
+        return ORJSONResponse(
+            content=build_error_response(request_id, error_msg),
+            status_code=422
+        )
+
+    except Exception as e:
+        error_msg = f"Error resuming request: {str(e)}"
+        logger.log_error(request_id, error_msg)
+        return ORJSONResponse(
+            content=build_error_response(request_id, error_msg),
+            status_code=500
+        )
+
+def format_sse(event: str, data: Dict[str, Any]) -> str:
+    """Format a single Server-Sent Events message"""
+    return f"event: {event}\ndata: {dumps_str(data)}\n\n"
+
+@app.post(
+    "/marketing-strategy/stream",
+    tags=["Marketing"],
+    summary="Stream marketing strategy",
+    description="Generate a marketing strategy, streaming each step as Server-Sent Events as soon as it completes"
+)
+async def stream_marketing_strategy(request: MarketingRequest) -> StreamingResponse:
+    if marketing_workflow is None:
+        raise HTTPException(
+            status_code=503,
+            detail="Service is initializing. Please try again in a moment."
+        )
+
+    async def event_stream() -> AsyncIterator[str]:
+        logger.log_workflow_step(request.request_id, "start", {"prompt": request.prompt, "stream": True})
+        try:
+            async for event in stream_workflow(
+                workflow=marketing_workflow,
+                request_id=request.request_id,
+                prompt=request.prompt,
+                response_depth=request.response_depth,
+                token_budget=request.token_budget
+            ):
+                yield format_sse(event["event"], {"request_id": request.request_id, **event["data"]})
+            logger.log_workflow_step(request.request_id, "complete", {"status": "success"})
+        except Exception as e:
+            error_msg = f"Error processing request: {str(e)}"
+            logger.log_error(request.request_id, error_msg)
+            yield format_sse("error", build_error_response(request.request_id, error_msg))
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@app.post(
+    "/marketing-strategy/batch",
+    tags=["Marketing"],
+    summary="Generate marketing strategies in batch",
+    description="Run many marketing requests with shared concurrency control; results are returned in completion order"
+)
+async def generate_marketing_strategy_batch(batch: BatchMarketingRequest) -> Response:
+    if marketing_workflow is None:
+        raise HTTPException(
+            status_code=503,
+            detail="Service is initializing. Please try again in a moment."
+        )
+    if len(batch.requests) > settings.BATCH_MAX_SIZE:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Batch too large: {len(batch.requests)} requests, maximum is {settings.BATCH_MAX_SIZE}"
+        )
+
+    concurrency = min(batch.max_concurrency or settings.BATCH_MAX_CONCURRENCY, settings.BATCH_MAX_CONCURRENCY)
+    semaphore = asyncio.Semaphore(concurrency)
+    logger.logger.info(f"Starting batch of {len(batch.requests)} requests with concurrency {concurrency}")
+
+    async def run_one(request: MarketingRequest) -> Dict[str, Any]:
+        async with semaphore:
+            try:
+                result = await run_workflow(request)
+                return build_strategy_response(request.request_id, result)
+            except Exception as e:
+                error_msg = f"Error processing request: {str(e)}"
+                logger.log_error(request.request_id, error_msg)
+                return build_error_response(request.request_id, error_msg)
+
+    tasks = [asyncio.create_task(run_one(request)) for request in batch.requests]
+
+    if batch.stream:
+        async def result_stream() -> AsyncIterator[bytes]:
+            try:
+                for next_result in asyncio.as_completed(tasks):
+                    yield dumps(await next_result) + b"\n"
+            finally:
+                for task in tasks:
+                    task.cancel()
+
+        return StreamingResponse(result_stream(), media_type="application/x-ndjson")
+
+    results: List[Dict[str, Any]] = [await next_result for next_result in asyncio.as_completed(tasks)]
+    failed = sum(1 for result in results if result["status"] == "error")
+    return ORJSONResponse(
+        content={
             "timestamp": datetime.now(UTC).isoformat(),
-            "status": "error",
-            "message": "Failed to generate marketing strategy. Please try again."
+            "total": len(results),
+            "succeeded": len(results) - failed,
+            "failed": failed,
+            "results": results
         }
+    )
 
-        return Response(
-            content=json.dumps(error_response, ensure_ascii=False),
-            status_code=500,
-            media_type="application/json"
+@app.post(
+    "/jobs",
+    tags=["Jobs"],
+    summary="Submit marketing strategy job",
+    description="Queue a marketing strategy request and return a job id immediately"
+)
+async def submit_job(request: MarketingRequest) -> Response:
+    if job_queue is None:
+        raise HTTPException(
+            status_code=503,
+            detail="Service is initializing. Please try again in a moment."
         )
-    
-    
+
+    try:
+        job = job_queue.submit(request)
+    except JobQueueFullException as e:
+        raise HTTPException(status_code=503, detail=e.message)
+
+    return ORJSONResponse(
+        content={
+            "job_id": job["job_id"],
+            "request_id": job["request_id"],
+            "status": job["status"],
+            "submitted_at": job["submitted_at"],
+            "status_url": f"/jobs/{job['job_id']}"
+        },
+        status_code=202
+    )
+
+@app.get(
+    "/jobs/{job_id}",
+    tags=["Jobs"],
+    summary="Get marketing strategy job",
+    description="Return the status of a queued job and its result once completed"
+)
+async def get_job(job_id: str) -> Response:
+    job = job_queue.get(job_id) if job_queue is not None else None
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job {job_id} not found")
+
+    return ORJSONResponse(content=job)
+
 @app.get(
     "/health",
     tags=["System"],
@@ -149,12 +449,23 @@ async def health_check() -> Dict[str, Any]:
     """
     try:
         is_ready = marketing_workflow is not None
+        result_cache = get_result_cache()
+        # Imported here so importing the API does not load LangChain
+        from agents.base_agent import get_agent_cache_stats
         return {
             "status": "healthy" if is_ready else "initializing",
             "workflow_ready": is_ready,
             "timestamp": datetime.now(UTC).isoformat(),
             "version": settings.APP_VERSION,
-            "environment": os.getenv("ENV", "development")
+            "environment": os.getenv("ENV", "development"),
+            "cache": {
+                "workflow": result_cache.stats() if result_cache is not None else {"backend": "none"},
+                "agent": get_agent_cache_stats()
+            },
+            "jobs": job_queue.stats() if job_queue is not None else None,
+            "llm_latency": get_latency_tracker().stats(),
+            "circuit_breakers": circuit_breaker_stats(),
+            "rate_limits": rate_limiter_stats()
         }
     except Exception as e:
         logger.logger.error(f"Health check failed: {str(e)}")
@@ -164,4 +475,16 @@ async def health_check() -> Dict[str, Any]:
             "timestamp": datetime.now(UTC).isoformat()
         }
 
+@app.get(
+    "/metrics",
+    tags=["System"],
+    summary="Prometheus metrics",
+    description="Expose workflow, node and LLM call metrics in the Prometheus text format"
+)
+async def metrics() -> Response:
+    return Response(
+        content=metrics_registry.render(),
+        media_type="text/plain; version=0.0.4; charset=utf-8"
+    )
+
 # Additional endpoints can be added here as needed
\ No newline at end of file
@@ -0,0 +1,268 @@
+"""
+Load-test POST /marketing-strategy in-process against the fake LLM backend.
+
+The app runs behind httpx's ASGI transport with its lifespan started
+manually, so no server, network or OpenAI account is involved. Each
+scenario keeps `concurrency` requests in flight until `requests` have
+completed and reports throughput, latency percentiles, event-loop lag and
+RSS. Throughput and latencies cover successful (200) responses only; any
+failed request aborts the run without writing results unless
+--allow-errors is given. Result caches, single-flight and checkpointing are off unless enabled
+through the environment, so every request runs the whole workflow.
+
+    python -m benchmarks.load_test --concurrency 1,8,32 --requests 200 --output load.json
+    python -m benchmarks.load_test --baseline load.json
+"""
+import argparse
+import asyncio
+import json
+import math
+import os
+import platform
+import random
+import resource
+import subprocess
+import sys
+import time
+from typing import Any, Dict, List, Optional
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PROMPTS = [
+    "Create a launch plan for a new organic skincare line targeting millennials",
+    "Increase online sales for a regional coffee roaster",
+    "Grow sign-ups for a B2B project management SaaS",
+    "Promote a boutique hotel opening in Lisbon",
+    "Re-engage lapsed customers of a fitness app",
+    "Build brand awareness for an electric bike startup"
+]
+
+# Sampling period of the event-loop lag monitor
+LAG_INTERVAL_SECONDS = 0.01
+
+
+def configure_environment(args: argparse.Namespace) -> None:
+    """Point the app at the fake LLM; must run before the app is imported"""
+    os.environ["LLM_BACKEND"] = "fake"
+    os.environ["FAKE_LLM_LATENCY_SECONDS"] = str(args.llm_latency)
+    os.environ["FAKE_LLM_SEED"] = str(args.seed)
+    os.environ.setdefault("OPENAI_API_KEY", "sk-benchmark-placeholder")
+    os.environ.setdefault("WORKFLOW_CACHE_ENABLED", "false")
+    os.environ.setdefault("AGENT_CACHE_BACKEND", "none")
+    os.environ.setdefault("SINGLE_FLIGHT_ENABLED", "false")
+    os.environ.setdefault("CHECKPOINTING_ENABLED", "false")
+
+
+def percentile(values: List[float], quantile: float) -> Optional[float]:
+    """Nearest-rank percentile, or None without values"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = min(max(math.ceil(quantile * len(ordered)), 1), len(ordered))
+    return ordered[rank - 1]
+
+
+def current_rss_mb() -> float:
+    """Resident set size of this process, falling back to the peak where /proc is unavailable"""
+    try:
+        with open("/proc/self/statm") as f:
+            pages = int(f.read().split()[1])
+        return pages * os.sysconf("SC_PAGE_SIZE") / 2 ** 20
+    except (OSError, ValueError):
+        return peak_rss_mb()
+
+
+def peak_rss_mb() -> float:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Reported in bytes on macOS and kilobytes elsewhere
+    return peak / 2 ** 20 if sys.platform == "darwin" else peak / 2 ** 10
+
+
+def git_revision() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+class LoopLagMonitor:
+    """Measures how late the event loop wakes a task that sleeps for a fixed interval"""
+    def __init__(self, interval: float = LAG_INTERVAL_SECONDS):
+        self.interval = interval
+        self.samples: List[float] = []
+        self._task: Optional[asyncio.Task] = None
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            start = loop.time()
+            await asyncio.sleep(self.interval)
+            self.samples.append(max(0.0, loop.time() - start - self.interval))
+
+    def start(self) -> None:
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> Dict[str, Optional[float]]:
+        self._task.cancel()
+        await asyncio.gather(self._task, return_exceptions=True)
+        return {
+            "mean_ms": _ms(sum(self.samples) / len(self.samples)) if self.samples else None,
+            "p99_ms": _ms(percentile(self.samples, 0.99)),
+            "max_ms": _ms(max(self.samples, default=None))
+        }
+
+
+def _ms(seconds: Optional[float]) -> Optional[float]:
+    return None if seconds is None else round(seconds * 1000, 2)
+
+
+async def run_scenario(client: Any, concurrency: int, total: int, depth: str, rng: random.Random) -> Dict[str, Any]:
+    """Keep `concurrency` requests in flight until `total` have completed"""
+    # Failed responses return early and would flatter the percentiles
+    latencies: List[float] = []
+    error_latencies: List[float] = []
+    statuses: Dict[str, int] = {}
+    remaining = iter(range(total))
+
+    async def worker() -> None:
+        for index in remaining:
+            payload = {"prompt": f"{rng.choice(PROMPTS)} (variant {index})", "response_depth": depth}
+            start = time.perf_counter()
+            response = await client.post("/marketing-strategy", json=payload)
+            elapsed = time.perf_counter() - start
+            (latencies if response.status_code == 200 else error_latencies).append(elapsed)
+            statuses[str(response.status_code)] = statuses.get(str(response.status_code), 0) + 1
+
+    rss_before = current_rss_mb()
+    monitor = LoopLagMonitor()
+    monitor.start()
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    loop_lag = await monitor.stop()
+
+    return {
+        "concurrency": concurrency,
+        "requests": total,
+        "errors": len(error_latencies),
+        "status_codes": statuses,
+        "duration_seconds": round(elapsed, 3),
+        "throughput_rps": round(len(latencies) / elapsed, 2),
+        "latency_ms": {
+            "mean": _ms(sum(latencies) / len(latencies)) if latencies else None,
+            "p50": _ms(percentile(latencies, 0.5)),
+            "p95": _ms(percentile(latencies, 0.95)),
+            "p99": _ms(percentile(latencies, 0.99)),
+            "max": _ms(max(latencies, default=None))
+        },
+        "error_latency_ms": {
+            "p50": _ms(percentile(error_latencies, 0.5)),
+            "max": _ms(max(error_latencies, default=None))
+        },
+        "event_loop_lag": loop_lag,
+        "rss_mb": {
+            "before": round(rss_before, 1),
+            "after": round(current_rss_mb(), 1),
+            "peak": round(peak_rss_mb(), 1)
+        }
+    }
+
+
+async def run_benchmark(args: argparse.Namespace) -> Dict[str, Any]:
+    import httpx
+    from api.endpoints import app
+
+    rng = random.Random(args.seed)
+    scenarios = []
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://benchmark", timeout=None) as client:
+            if args.warmup:
+                await run_scenario(client, min(args.warmup, max(args.concurrency)), args.warmup, args.depth, rng)
+            for concurrency in args.concurrency:
+                result = await run_scenario(client, concurrency, args.requests, args.depth, rng)
+                scenarios.append(result)
+                latency = result["latency_ms"]
+                print(
+                    f"concurrency {concurrency:>4}: {result['throughput_rps']:>8.2f} req/s  "
+                    f"p50 {latency['p50']} ms  p95 {latency['p95']} ms  p99 {latency['p99']} ms  "
+                    f"loop lag max {result['event_loop_lag']['max_ms']} ms  "
+                    f"rss {result['rss_mb']['after']} MB  errors {result['errors']}"
+                )
+                if result["errors"]:
+                    print(
+                        f"WARNING: {result['errors']} of {result['requests']} requests failed "
+                        f"(status codes {result['status_codes']}); see the logs for the cause",
+                        file=sys.stderr
+                    )
+
+    return {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "git_revision": git_revision(),
+        "python": platform.python_version(),
+        "config": {
+            "requests": args.requests,
+            "warmup": args.warmup,
+            "response_depth": args.depth,
+            "llm_latency_seconds": args.llm_latency,
+            "seed": args.seed,
+            "environment": {
+                key: os.environ[key]
+                for key in sorted(os.environ)
+                if key.startswith(("FAKE_LLM_", "LLM_", "WORKFLOW_CACHE_", "AGENT_CACHE_", "SINGLE_FLIGHT_", "CHECKPOINTING_", "LOG_LEVEL"))
+            }
+        },
+        "scenarios": scenarios
+    }
+
+
+def compare(report: Dict[str, Any], baseline_path: str) -> None:
+    """Print throughput and p95 changes against an earlier results file"""
+    with open(baseline_path) as f:
+        baseline = {scenario["concurrency"]: scenario for scenario in json.load(f)["scenarios"]}
+    print(f"Compared with {baseline_path}:")
+    for scenario in report["scenarios"]:
+        previous = baseline.get(scenario["concurrency"])
+        if previous is None or not previous["latency_ms"]["p95"] or not scenario["latency_ms"]["p95"]:
+            continue
+        throughput = scenario["throughput_rps"] / previous["throughput_rps"] - 1
+        p95 = scenario["latency_ms"]["p95"] / previous["latency_ms"]["p95"] - 1
+        print(f"concurrency {scenario['concurrency']:>4}: throughput {throughput:+.1%}  p95 {p95:+.1%}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument(
+        "--concurrency",
+        type=lambda value: [int(level) for level in value.split(",")],
+        default=[1, 8, 32],
+        help="comma-separated concurrency levels, one scenario each"
+    )
+    parser.add_argument("--requests", type=int, default=100, help="requests per scenario")
+    parser.add_argument("--warmup", type=int, default=10, help="unrecorded requests sent before the first scenario")
+    parser.add_argument("--depth", choices=["summary", "full"], default="summary", help="response_depth of each request")
+    parser.add_argument("--llm-latency", type=float, default=0.05, help="mean fake LLM time to first token in seconds")
+    parser.add_argument("--seed", type=int, default=0, help="seed for prompts and the fake LLM")
+    parser.add_argument("--output", default="load_test_results.json", help="file to write results to")
+    parser.add_argument("--baseline", help="earlier results file to compare against")
+    parser.add_argument("--allow-errors", action="store_true", help="write results even if some requests failed")
+    args = parser.parse_args()
+
+    configure_environment(args)
+    report = asyncio.run(run_benchmark(args))
+
+    failed = sum(scenario["errors"] for scenario in report["scenarios"])
+    if failed and not args.allow_errors:
+        sys.exit(f"{failed} requests failed; results not written (pass --allow-errors to keep them)")
+
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Results written to {args.output}")
+    if args.baseline:
+        compare(report, args.baseline)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,150 @@
+"""
+Measure the cold-start cost of the API.
+
+Every run starts a fresh interpreter that times importing api.endpoints and
+then running the FastAPI lifespan until the app is ready to serve requests.
+No LLM calls are made, so a placeholder OPENAI_API_KEY is used when unset.
+
+    python -m benchmarks.startup --runs 5 --output startup.json
+    python -m benchmarks.startup --importtime 15
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Any, Dict, List
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Dependencies whose import cost dominates startup
+HEAVY_MODULES = [
+    "langchain_core",
+    "langchain_openai",
+    "openai",
+    "tiktoken",
+    "langgraph",
+    "aiosqlite",
+    "rdflib",
+    "pydantic_settings"
+]
+
+
+def _loaded_heavy_modules() -> List[str]:
+    return [name for name in HEAVY_MODULES if name in sys.modules]
+
+
+def measure_once() -> Dict[str, Any]:
+    """Time the import and lifespan startup in this (fresh) interpreter"""
+    start = time.perf_counter()
+    from api.endpoints import app
+    imported = time.perf_counter()
+    loaded_at_import = _loaded_heavy_modules()
+
+    async def start_app() -> float:
+        async with app.router.lifespan_context(app):
+            ready = time.perf_counter()
+        return ready
+
+    ready = asyncio.run(start_app())
+    return {
+        "import_seconds": imported - start,
+        "lifespan_seconds": ready - imported,
+        "time_to_ready_seconds": ready - start,
+        "heavy_modules_after_import": loaded_at_import,
+        "heavy_modules_after_lifespan": _loaded_heavy_modules()
+    }
+
+
+def _child_env(workdir: str) -> Dict[str, str]:
+    env = dict(os.environ)
+    env.setdefault("OPENAI_API_KEY", "sk-benchmark-placeholder")
+    env.setdefault("CHECKPOINT_DB_PATH", os.path.join(workdir, "checkpoints.sqlite"))
+    env.setdefault("LOG_LEVEL", "WARNING")
+    return env
+
+
+def run_child(workdir: str, importtime: bool = False) -> subprocess.CompletedProcess:
+    command = [sys.executable]
+    if importtime:
+        command += ["-X", "importtime"]
+    command += ["-m", "benchmarks.startup", "--child"]
+    return subprocess.run(command, cwd=ROOT, env=_child_env(workdir), capture_output=True, text=True)
+
+
+def slowest_imports(stderr: str, limit: int) -> List[Dict[str, Any]]:
+    """Top-level packages ranked by cumulative import time from -X importtime output"""
+    totals: Dict[str, int] = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        fields = line[len("import time:"):].split("|")
+        if len(fields) != 3 or not fields[1].strip().isdigit():
+            continue
+        package = fields[2].strip().split(".")[0]
+        totals[package] = max(totals.get(package, 0), int(fields[1]))
+    ranked = sorted(totals.items(), key=lambda item: item[1], reverse=True)[:limit]
+    return [{"module": name, "cumulative_ms": round(us / 1000, 1)} for name, us in ranked]
+
+
+def summarize(runs: List[Dict[str, Any]]) -> Dict[str, Any]:
+    summary: Dict[str, Any] = {}
+    for key in ("process_seconds", "import_seconds", "lifespan_seconds", "time_to_ready_seconds"):
+        values = [run[key] for run in runs]
+        summary[key] = {
+            "median": round(statistics.median(values), 4),
+            "min": round(min(values), 4),
+            "max": round(max(values), 4)
+        }
+    summary["heavy_modules_after_import"] = runs[-1]["heavy_modules_after_import"]
+    summary["heavy_modules_after_lifespan"] = runs[-1]["heavy_modules_after_lifespan"]
+    return summary
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5, help="fresh interpreters to start")
+    parser.add_argument("--output", help="write results as JSON to this file")
+    parser.add_argument("--importtime", type=int, metavar="N", help="also list the N slowest top-level imports")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(measure_once()))
+        return
+
+    runs = []
+    with tempfile.TemporaryDirectory() as workdir:
+        for _ in range(args.runs):
+            started = time.perf_counter()
+            child = run_child(workdir)
+            if child.returncode != 0:
+                sys.exit(f"Startup failed:\n{child.stderr}")
+            run = json.loads(child.stdout.strip().splitlines()[-1])
+            run["process_seconds"] = time.perf_counter() - started
+            runs.append(run)
+        report: Dict[str, Any] = {"python": sys.version.split()[0], "runs": runs, "summary": summarize(runs)}
+        if args.importtime:
+            report["slowest_imports"] = slowest_imports(run_child(workdir, importtime=True).stderr, args.importtime)
+
+    summary = report["summary"]
+    for key in ("process_seconds", "import_seconds", "lifespan_seconds", "time_to_ready_seconds"):
+        stats = summary[key]
+        print(f"{key:<24} median {stats['median']:.3f}s  min {stats['min']:.3f}s  max {stats['max']:.3f}s")
+    print(f"heavy modules after import:   {', '.join(summary['heavy_modules_after_import']) or '-'}")
+    print(f"heavy modules after lifespan: {', '.join(summary['heavy_modules_after_lifespan']) or '-'}")
+    for entry in report.get("slowest_imports", []):
+        print(f"  {entry['module']:<28} {entry['cumulative_ms']:>8.1f} ms")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -23,15 +23,102 @@ class Settings(BaseSettings):
     OPENAI_TOP_P: float = 1.0
     OPENAI_FREQUENCY_PENALTY: float = 0.0
     OPENAI_PRESENCE_PENALTY: float = 0.0
+    OPENAI_MAX_RETRIES: int = 0  # client-level retries; agents retry transient errors themselves
+
+    # LLM Backend Settings ("openai", or "fake" for offline benchmarking)
+    LLM_BACKEND: str = "openai"
+    FAKE_LLM_LATENCY_DISTRIBUTION: str = "lognormal"  # "fixed", "uniform", "normal" or "lognormal"
+    FAKE_LLM_LATENCY_SECONDS: float = 0.5  # mean time to first token
+    FAKE_LLM_LATENCY_JITTER: float = 0.25  # half-width (uniform), stddev (normal) or sigma (lognormal)
+    FAKE_LLM_LATENCIES: Dict[str, float] = {}  # mean per call, e.g. {"summarizer": 2.0, "seo": 0.8}
+    FAKE_LLM_TOKENS_PER_SECOND: float = 0.0  # completion generation rate; 0 skips generation time
+    FAKE_LLM_FAILURE_RATE: float = 0.0  # fraction of calls failing with FAKE_LLM_FAILURE_STATUS
+    FAKE_LLM_FAILURE_STATUS: int = 503
+    FAKE_LLM_LIST_ITEMS: int = 3  # entries per list/dict in canned outputs
+    FAKE_LLM_DEPARTMENTS: Optional[int] = None  # departments the fake CEO selects; None selects all
+    FAKE_LLM_SEED: Optional[int] = None
+
+    # Maximum number of LLM calls in flight across the whole process
+    LLM_MAX_CONCURRENCY: int = 64
+
+    # OpenAI HTTP Connection Pool Settings
+    OPENAI_MAX_CONNECTIONS: int = 100
+    OPENAI_MAX_KEEPALIVE_CONNECTIONS: int = 20
+    OPENAI_KEEPALIVE_EXPIRY: float = 30.0
+    OPENAI_REQUEST_TIMEOUT: float = 120.0
+    OPENAI_CONNECT_TIMEOUT: float = 10.0
+
+    # Agent Timeout and Hedging Settings
+    AGENT_TIMEOUT_SECONDS: float = 90.0  # deadline for one agent call, hedges included
+    AGENT_TIMEOUTS: Dict[str, float] = {}  # per agent class, e.g. {"SummarizerAgent": 180}
+    LLM_HEDGING_ENABLED: bool = False
+    LLM_HEDGE_PERCENTILE: float = 0.95
+    LLM_HEDGE_MIN_SAMPLES: int = 20  # observed calls needed before hedging starts
+    LLM_HEDGE_MIN_DELAY_SECONDS: float = 1.0
+
+    # Rate Limit Settings (None disables the limit)
+    LLM_RATE_LIMIT_RPM: Optional[int] = None
+    LLM_RATE_LIMIT_TPM: Optional[int] = None
+    LLM_RATE_LIMITS: Dict[str, Dict[str, int]] = {}  # per model, e.g. {"gpt-4o-mini": {"rpm": 500, "tpm": 200000}}
+
+    # Retry and Circuit Breaker Settings
+    LLM_RETRY_ATTEMPTS: int = 3  # total attempts for transient 429/5xx/connection errors
+    LLM_RETRY_INITIAL_WAIT: float = 1.0
+    LLM_RETRY_MAX_WAIT: float = 20.0
+    CIRCUIT_BREAKER_FAILURE_THRESHOLD: int = 5  # consecutive failed calls before failing fast
+    CIRCUIT_BREAKER_RESET_SECONDS: float = 30.0
 
     # LangChain Settings
     LANGCHAIN_VERBOSE: bool = False
     LANGCHAIN_DEBUG: bool = False
 
+    # Agent Ontology Settings
+    ONTOLOGY_PATH: Optional[str] = None  # defaults to ontology/agents.owl
+
+    # Workflow Result Cache Settings
+    WORKFLOW_CACHE_ENABLED: bool = True
+    WORKFLOW_CACHE_MAX_SIZE: int = 256
+    WORKFLOW_CACHE_TTL_SECONDS: int = 3600
+    WORKFLOW_CACHE_SQLITE_PATH: Optional[str] = None
+
+    # Share one workflow run between concurrent identical requests
+    SINGLE_FLIGHT_ENABLED: bool = True
+
+    # Workflow Checkpoint Settings (per request_id, used to resume failed runs)
+    CHECKPOINTING_ENABLED: bool = False  # checkpoints are kept until CHECKPOINT_DB_PATH is removed
+    CHECKPOINT_DB_PATH: str = "workflow_checkpoints.sqlite"
+
+    # Agent Call Cache Settings
+    AGENT_CACHE_BACKEND: str = "memory"  # "memory", "sqlite" or "none"
+    AGENT_CACHE_MAX_SIZE: int = 1024
+    AGENT_CACHE_TTL_SECONDS: int = 3600
+    AGENT_CACHE_SQLITE_PATH: str = "agent_cache.sqlite"
+
+    # Background Job Settings
+    JOB_WORKERS: int = 4
+    JOB_QUEUE_MAX_SIZE: int = 100
+    JOB_RESULT_TTL_SECONDS: int = 3600
+
+    # Token Budget Settings
+    TOKEN_BUDGET_DEFAULT: Optional[int] = None  # per request; None means unlimited
+    TOKEN_BUDGET_MODE: str = "degrade"  # "degrade" lowers max_tokens / skips finalize, "reject" fails fast
+    TOKEN_BUDGET_MIN_COMPLETION_TOKENS: int = 256
+
+    # Summarizer Settings
+    SUMMARIZER_INPUT_TOKEN_BUDGET: int = 6000  # department output tokens; 0 disables trimming
+
+    # Batch Settings
+    BATCH_MAX_SIZE: int = 500
+    BATCH_MAX_CONCURRENCY: int = 8
+
     class Config:
         env_file = ".env"
         case_sensitive = True
 
+    def get_agent_timeout(self, agent_name: str) -> float:
+        """Get the call deadline for an agent class"""
+        return self.AGENT_TIMEOUTS.get(agent_name, self.AGENT_TIMEOUT_SECONDS)
+
     def get_openai_config(self) -> Dict:
         """Get OpenAI configuration dictionary"""
         return {
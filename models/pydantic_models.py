@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field, ConfigDict
-from typing import Dict, List, Optional, Any, Annotated
+from typing import Dict, List, Optional, Any, Annotated, Literal
 from datetime import datetime
 import uuid
 import operator
@@ -8,10 +8,30 @@ import operator
 class MarketingRequest(BaseModel):
     request_id: str = Field(default_factory=lambda: str(uuid.uuid4()))
     prompt: str = Field(..., description="Marketing request or question")
+    response_depth: Literal["summary", "full"] = Field(
+        default="summary",
+        description="'summary' returns the integrated strategy; 'full' also generates and returns the CEO final report"
+    )
+    token_budget: Optional[int] = Field(
+        default=None,
+        ge=1,
+        description="Maximum prompt plus completion tokens to spend on this request"
+    )
     timestamp: datetime = Field(default_factory=datetime.utcnow)
 
     model_config = ConfigDict(arbitrary_types_allowed=True)
 
+class BatchMarketingRequest(BaseModel):
+    requests: List[MarketingRequest] = Field(..., min_length=1, description="Marketing requests to run")
+    max_concurrency: Optional[int] = Field(
+        default=None,
+        ge=1,
+        description="Maximum number of workflows to run at once, capped by the server limit"
+    )
+    stream: bool = Field(default=False, description="Stream results as NDJSON as they complete")
+
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
 # Department Task Models
 class Department(BaseModel):
     justification: str
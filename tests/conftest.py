@@ -0,0 +1,12 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Settings are read at import time; no test talks to OpenAI
+os.environ.setdefault("OPENAI_API_KEY", "sk-test-placeholder")
+os.environ.setdefault("CHECKPOINTING_ENABLED", "false")
+os.environ.setdefault("LLM_BACKEND", "fake")
+os.environ.setdefault("FAKE_LLM_LATENCY_SECONDS", "0")
+os.environ.setdefault("FAKE_LLM_SEED", "0")
+os.environ.setdefault("AGENT_CACHE_BACKEND", "none")
@@ -0,0 +1,79 @@
+import asyncio
+
+import pytest
+
+from agents import base_agent
+from agents.base_agent import BaseAgent
+from utils.exceptions import TimeoutException
+from utils.rate_limiter import RateLimiter
+from utils.resilience import CircuitBreaker
+
+
+class UpstreamError(Exception):
+    status_code = 503
+
+
+class StubChain:
+    """Chain stand-in whose first call fails and hands the LLM slot to another holder"""
+    def __init__(self, semaphore: asyncio.Semaphore):
+        self.semaphore = semaphore
+        self.calls = 0
+
+    async def ainvoke(self, request):
+        self.calls += 1
+        # Queues for the slot this attempt holds, so the retry has to wait for it
+        asyncio.ensure_future(self.semaphore.acquire())
+        raise UpstreamError()
+
+
+@pytest.fixture
+def breaker(monkeypatch):
+    breaker = CircuitBreaker("test", failure_threshold=1, reset_seconds=60)
+    monkeypatch.setattr(base_agent, "get_circuit_breaker", lambda *args, **kwargs: breaker)
+    return breaker
+
+
+def test_timeout_while_queued_for_a_retry_releases_the_breaker(monkeypatch, breaker):
+    monkeypatch.setattr(base_agent.settings, "AGENT_TIMEOUT_SECONDS", 0.1)
+    monkeypatch.setattr(base_agent.settings, "LLM_RETRY_INITIAL_WAIT", 0)
+    monkeypatch.setattr(base_agent.settings, "LLM_RETRY_MAX_WAIT", 0)
+    monkeypatch.setattr(base_agent, "get_rate_limiter", lambda model: None)
+
+    async def run():
+        semaphore = asyncio.Semaphore(1)
+        monkeypatch.setattr(base_agent, "get_llm_semaphore", lambda: semaphore)
+        chain = StubChain(semaphore)
+        with pytest.raises(TimeoutException):
+            await BaseAgent()._invoke(chain, "default", {}, prompt_tokens=10)
+        return chain.calls
+
+    assert asyncio.run(run()) == 1
+    assert breaker.state == CircuitBreaker.CLOSED
+    assert breaker.failures == 0
+
+
+def test_cancelling_before_the_first_attempt_returns_the_slot_and_reservation(monkeypatch, breaker):
+    limiter = RateLimiter("test", tpm=100000)
+    monkeypatch.setattr(base_agent, "get_rate_limiter", lambda model: limiter)
+
+    async def stalled(call, **kwargs):
+        await asyncio.Event().wait()
+
+    monkeypatch.setattr(base_agent, "with_retries", stalled)
+
+    async def run():
+        semaphore = asyncio.Semaphore(1)
+        monkeypatch.setattr(base_agent, "get_llm_semaphore", lambda: semaphore)
+        task = asyncio.ensure_future(BaseAgent()._invoke(object(), "default", {}, prompt_tokens=10))
+        await asyncio.sleep(0.01)
+        assert semaphore.locked()
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        return semaphore
+
+    semaphore = asyncio.run(run())
+
+    assert not semaphore.locked()
+    assert limiter.tokens.available() == limiter.tokens.capacity
+    assert breaker.state == CircuitBreaker.CLOSED
@@ -0,0 +1,54 @@
+import asyncio
+
+from agents.ceo_agent import DEPARTMENT_SELECTION_PROMPT, format_departments
+from agents.registry import get_agent_registry
+from models.pydantic_models import SEOResponse, SummarizerResponse, TaskBreakdown
+from utils.fake_llm import FakeChatModel
+from utils.serialization import loads
+
+
+def ask(model: FakeChatModel, prompt: str):
+    return loads(asyncio.run(model.ainvoke(prompt)).content)
+
+
+def test_default_config_selects_every_department_with_valid_priorities():
+    departments = get_agent_registry().routing_hints()
+    model = FakeChatModel(latency_seconds=0, seed=0)
+    prompt = DEPARTMENT_SELECTION_PROMPT.replace(
+        "AVAILABLE_DEPARTMENTS", format_departments(departments)
+    ).format(request="Sell more coffee")
+
+    breakdown = TaskBreakdown.model_validate(ask(model, prompt))
+
+    assert set(breakdown.selected_departments) == set(departments)
+
+
+def test_outputs_match_agent_schemas():
+    model = FakeChatModel(latency_seconds=0, seed=0)
+
+    SEOResponse.model_validate(ask(model, "You are an SEO Manager specialized in search optimization."))
+    SummarizerResponse.model_validate(ask(model, "Review and integrate the following department responses"))
+
+
+def test_injected_failures_carry_a_retryable_status():
+    model = FakeChatModel(latency_seconds=0, failure_rate=1.0, failure_status=503)
+
+    try:
+        asyncio.run(model.ainvoke("You are an SEO Manager"))
+    except Exception as e:
+        assert e.status_code == 503
+    else:
+        raise AssertionError("expected an injected failure")
+
+
+def test_lowered_max_tokens_truncates_the_completion():
+    model = FakeChatModel(latency_seconds=0, seed=0)
+    prompt = "You are an SEO Manager specialized in search optimization."
+    full = asyncio.run(model.ainvoke(prompt))
+
+    message = asyncio.run(FakeChatModel(latency_seconds=0, seed=0).ainvoke(prompt, max_tokens=20))
+
+    assert message.usage_metadata["output_tokens"] == 20
+    assert full.usage_metadata["output_tokens"] > 20
+    assert full.content.startswith(message.content) and len(message.content) < len(full.content)
+    assert message.response_metadata["finish_reason"] == "length"
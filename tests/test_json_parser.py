@@ -0,0 +1,42 @@
+from utils.json_parser import parse_json_output
+
+
+def test_valid_object_parses_on_the_fast_path():
+    result = parse_json_output('{"a": 1}')
+
+    assert result.outcome == "fast"
+    assert result.value == {"a": 1}
+
+
+def test_object_after_bracketed_prose_is_repaired():
+    result = parse_json_output('Here are the [3] departments: {"a": 1}')
+
+    assert result.outcome == "repaired"
+    assert result.value == {"a": 1}
+
+
+def test_fenced_object_with_trailing_comma_is_repaired():
+    result = parse_json_output('```json\n{"a": [1, 2,],}\n```')
+
+    assert result.value == {"a": [1, 2]}
+
+
+def test_truncated_object_is_closed():
+    result = parse_json_output('{"a": [1, 2], "b": "unfinish')
+
+    assert result.ok and result.truncated
+    assert result.value["a"] == [1, 2]
+
+
+def test_complete_repaired_object_is_not_marked_truncated():
+    result = parse_json_output('{"a": [1, 2,],}')
+
+    assert result.outcome == "repaired"
+    assert not result.truncated
+
+
+def test_text_without_object_fails_with_reason():
+    result = parse_json_output("no json here")
+
+    assert result.outcome == "failed"
+    assert result.as_error()["reason"] == "no JSON object found"
@@ -0,0 +1,49 @@
+import asyncio
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from utils import rate_limiter
+from utils.rate_limiter import RateLimiter, TokenBucket
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Frozen monotonic clock that tests advance by hand"""
+    clock = SimpleNamespace(now=1000.0)
+    monkeypatch.setattr(
+        rate_limiter,
+        "time",
+        SimpleNamespace(monotonic=lambda: clock.now, perf_counter=time.perf_counter)
+    )
+    return clock
+
+
+def test_bucket_refills_at_its_per_minute_rate_up_to_capacity(clock):
+    bucket = TokenBucket(600)
+    asyncio.run(bucket.acquire(600))
+
+    clock.now += 10
+    assert bucket.available() == 100
+
+    clock.now += 120
+    assert bucket.available() == 600
+
+
+def test_reconcile_returns_unused_tokens(clock):
+    limiter = RateLimiter("test", tpm=1000)
+    asyncio.run(limiter.acquire(800))
+
+    limiter.reconcile(800, 300)
+
+    assert limiter.tokens.available() == 700
+
+
+def test_reconcile_charges_tokens_used_beyond_the_estimate(clock):
+    limiter = RateLimiter("test", tpm=1000)
+    asyncio.run(limiter.acquire(800))
+
+    limiter.reconcile(800, 1100)
+
+    assert limiter.tokens.available() == -100
@@ -0,0 +1,97 @@
+import asyncio
+
+import pytest
+
+from utils.exceptions import CircuitOpenException
+from utils.resilience import CircuitBreaker, hedged, run_with_timeout, with_retries
+
+
+class UpstreamError(Exception):
+    def __init__(self, status_code: int):
+        super().__init__(f"upstream returned {status_code}")
+        self.status_code = status_code
+
+
+def test_timeout_during_hedge_phase_cancels_both_attempts():
+    finished = []
+
+    async def call():
+        await asyncio.sleep(0.5)
+        finished.append(True)
+
+    async def main():
+        try:
+            await run_with_timeout(hedged(call, 0.05), 0.15, lambda: TimeoutError("deadline"))
+        except TimeoutError:
+            pass
+        await asyncio.sleep(0.6)
+
+    asyncio.run(main())
+
+    assert finished == []
+
+
+def test_breaker_opens_after_threshold_consecutive_failures():
+    breaker = CircuitBreaker("test", failure_threshold=3, reset_seconds=60)
+
+    for _ in range(3):
+        breaker.before_call()
+        breaker.record_failure()
+
+    assert breaker.state == CircuitBreaker.OPEN
+    with pytest.raises(CircuitOpenException):
+        breaker.before_call()
+
+
+def test_half_open_breaker_admits_a_single_probe():
+    breaker = CircuitBreaker("test", failure_threshold=1, reset_seconds=0)
+    breaker.before_call()
+    breaker.record_failure()
+
+    breaker.before_call()
+
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    with pytest.raises(CircuitOpenException):
+        breaker.before_call()
+    breaker.record_success()
+    assert breaker.state == CircuitBreaker.CLOSED
+
+
+def test_release_frees_the_probe_without_counting_a_failure():
+    breaker = CircuitBreaker("test", failure_threshold=1, reset_seconds=0)
+    breaker.before_call()
+    breaker.record_failure()
+    breaker.before_call()
+
+    breaker.release()
+
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    assert breaker.failures == 1
+    breaker.before_call()
+
+
+def test_retryable_errors_are_retried_until_success():
+    calls = 0
+
+    async def call():
+        nonlocal calls
+        calls += 1
+        if calls < 3:
+            raise UpstreamError(503)
+        return "ok"
+
+    assert asyncio.run(with_retries(call, attempts=3, initial_wait=0, max_wait=0)) == "ok"
+    assert calls == 3
+
+
+def test_non_retryable_errors_are_raised_without_retrying():
+    calls = 0
+
+    async def call():
+        nonlocal calls
+        calls += 1
+        raise UpstreamError(400)
+
+    with pytest.raises(UpstreamError):
+        asyncio.run(with_retries(call, attempts=3, initial_wait=0, max_wait=0))
+    assert calls == 1
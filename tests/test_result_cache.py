@@ -0,0 +1,60 @@
+import asyncio
+
+from utils.cache import MemoryCache
+from workflow import langgraph_workflow
+
+
+class StubGraph:
+    """Compiled-graph stand-in that counts how often the workflow actually runs"""
+    checkpointer = None
+
+    def __init__(self):
+        self.runs = 0
+
+    async def ainvoke(self, graph_input, config=None):
+        self.runs += 1
+        return {
+            "status": "completed",
+            "selected_departments": {"seo": {"task": "Research coffee keywords", "priority": 1}},
+            "summarized_response": {"integrated_strategy": "plan"},
+            "department_responses": {"seo": {"keywords": ["coffee"]}},
+            "response_depth": "summary"
+        }
+
+
+def test_second_identical_request_is_served_from_empty_memory_cache(monkeypatch):
+    cache = MemoryCache(max_size=16, ttl_seconds=60)
+    monkeypatch.setattr(langgraph_workflow, "get_result_cache", lambda: cache)
+    graph = StubGraph()
+
+    async def run_twice():
+        first = await langgraph_workflow.execute_workflow(graph, "req-1", "Sell more coffee")
+        second = await langgraph_workflow.execute_workflow(graph, "req-2", "Sell more coffee")
+        return first, second
+
+    first, second = asyncio.run(run_twice())
+
+    assert first["cached"] is False
+    assert second["cached"] is True
+    assert second["summary"] == first["summary"]
+    assert graph.runs == 1
+    assert len(cache) == 1
+
+
+def test_cache_hit_stream_replays_the_department_selection(monkeypatch):
+    cache = MemoryCache(max_size=16, ttl_seconds=60)
+    monkeypatch.setattr(langgraph_workflow, "get_result_cache", lambda: cache)
+    graph = StubGraph()
+
+    async def run_then_stream():
+        await langgraph_workflow.execute_workflow(graph, "req-1", "Sell more coffee")
+        return [event async for event in langgraph_workflow.stream_workflow(graph, "req-2", "Sell more coffee")]
+
+    events = asyncio.run(run_then_stream())
+
+    assert events[0] == {
+        "event": "departments_selected",
+        "data": {"selected_departments": {"seo": {"task": "Research coffee keywords", "priority": 1}}}
+    }
+    assert [event["event"] for event in events[1:]] == ["department_response", "summary", "complete"]
+    assert graph.runs == 1
@@ -0,0 +1,62 @@
+import asyncio
+
+import pytest
+
+from utils.single_flight import SingleFlight
+
+
+def test_concurrent_callers_share_one_result():
+    flight = SingleFlight()
+    calls = 0
+
+    async def work():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return "plan"
+
+    async def run():
+        return await asyncio.gather(flight.do("key", work), flight.do("key", work))
+
+    (first, first_shared), (second, second_shared) = asyncio.run(run())
+
+    assert first == second == "plan"
+    assert (first_shared, second_shared) == (False, True)
+    assert calls == 1
+    assert flight.in_flight() == 0
+
+
+def test_concurrent_callers_share_one_exception():
+    flight = SingleFlight()
+
+    async def work():
+        await asyncio.sleep(0.01)
+        raise ValueError("workflow failed")
+
+    async def run():
+        return await asyncio.gather(flight.do("key", work), flight.do("key", work), return_exceptions=True)
+
+    first, second = asyncio.run(run())
+
+    assert isinstance(first, ValueError) and second is first
+    assert flight.in_flight() == 0
+
+
+def test_leader_disconnecting_does_not_cancel_followers():
+    flight = SingleFlight()
+
+    async def work():
+        await asyncio.sleep(0.05)
+        return "plan"
+
+    async def run():
+        leader = asyncio.ensure_future(flight.do("key", work))
+        await asyncio.sleep(0)
+        follower = asyncio.ensure_future(flight.do("key", work))
+        await asyncio.sleep(0.01)
+        leader.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await leader
+        return await follower
+
+    assert asyncio.run(run()) == ("plan", True)
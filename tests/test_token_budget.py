@@ -0,0 +1,50 @@
+import asyncio
+
+from utils.tokens import TokenUsage
+
+
+def test_planned_calls_split_the_remaining_budget():
+    usage = TokenUsage(budget=9000)
+    usage.plan(3)
+
+    first = usage.claim_share()
+    usage.reserve(first)
+
+    assert first == 3000
+    assert usage.claim_share() == 3000
+    assert usage.pending == 1
+
+
+def test_unplanned_call_may_use_the_whole_remaining_budget():
+    usage = TokenUsage(budget=9000)
+    usage.record("CEOAgent", 400, 600)
+
+    assert usage.claim_share() == 8000
+
+
+def test_budget_with_headroom_over_actual_usage_completes():
+    from agents.registry import get_agent_registry
+    from config.settings import get_settings
+    from workflow.langgraph_workflow import create_marketing_workflow, execute_workflow
+
+    registry = get_agent_registry()
+    workflow = create_marketing_workflow(
+        ceo_agent=registry.get(registry.orchestrator_code),
+        department_agents=registry.departments(),
+        summarizer_agent=registry.get(registry.summarizer_code)
+    )
+    prompt = "Increase online sales for a regional coffee roaster"
+
+    unbudgeted = asyncio.run(execute_workflow(workflow, "req-1", prompt, use_cache=False))
+    used = unbudgeted["token_usage"]["total_tokens"]
+    # Well under the worst case of every call spending its full max_tokens
+    budget = used * 2
+    calls = sum(totals["calls"] for totals in unbudgeted["token_usage"]["by_agent"].values())
+    assert budget < calls * get_settings().OPENAI_MAX_TOKENS
+
+    budgeted = asyncio.run(execute_workflow(workflow, "req-2", prompt, token_budget=budget, use_cache=False))
+
+    assert budgeted["status"] == "success"
+    assert budgeted["token_usage"]["degraded"] == []
+    assert budgeted["department_responses"].keys() == unbudgeted["department_responses"].keys()
+    assert budgeted["token_usage"]["total_tokens"] <= budget
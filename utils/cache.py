@@ -0,0 +1,223 @@
+import asyncio
+import hashlib
+import sqlite3
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+
+from utils.serialization import dumps, dumps_str, loads
+
+
+def normalize_prompt(prompt: str) -> str:
+    """Normalize a prompt so trivially different spellings share a cache entry"""
+    return " ".join(unicodedata.normalize("NFKC", prompt).split())
+
+
+def make_cache_key(*parts: Any) -> str:
+    """Build a stable hash key from JSON-serializable parts"""
+    return hashlib.sha256(dumps(parts, sort_keys=True)).hexdigest()
+
+
+class CacheBackend:
+    """Base class for result caches with hit/miss accounting"""
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str) -> Optional[Any]:
+        raise NotImplementedError
+
+    def set(self, key: str, value: Any) -> None:
+        raise NotImplementedError
+
+    def clear(self) -> None:
+        raise NotImplementedError
+
+    async def aget(self, key: str) -> Optional[Any]:
+        """Async lookup; backends doing blocking I/O override this"""
+        return self.get(key)
+
+    async def aset(self, key: str, value: Any) -> None:
+        """Async store; backends doing blocking I/O override this"""
+        self.set(key, value)
+
+    def _record(self, value: Optional[Any]) -> Optional[Any]:
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return value
+
+    def stats(self) -> Dict[str, Any]:
+        """Return hit/miss counters for this cache"""
+        total = self.hits + self.misses
+        return {
+            "backend": type(self).__name__,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 4) if total else 0.0
+        }
+
+
+class MemoryCache(CacheBackend):
+    """In-process LRU cache with per-entry TTL and size-based eviction"""
+    def __init__(self, max_size: int = 256, ttl_seconds: Optional[float] = 3600):
+        super().__init__()
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _lookup(self, key: str) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at is not None and expires_at < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def get(self, key: str) -> Optional[Any]:
+        return self._record(self._lookup(key))
+
+    def set(self, key: str, value: Any) -> None:
+        if self.max_size <= 0:
+            return
+        expires_at = time.monotonic() + self.ttl_seconds if self.ttl_seconds else None
+        with self._lock:
+            self._entries[key] = (expires_at, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> Dict[str, Any]:
+        stats = super().stats()
+        stats.update({"size": len(self._entries), "max_size": self.max_size})
+        return stats
+
+
+class SQLiteCache(CacheBackend):
+    """On-disk cache backed by a local SQLite file, values stored as JSON"""
+    def __init__(
+        self,
+        path: str,
+        table: str = "cache",
+        ttl_seconds: Optional[float] = 3600
+    ):
+        super().__init__()
+        if not table.isidentifier():
+            raise ValueError(f"Invalid cache table name: {table}")
+        self.path = path
+        self.table = table
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                f"CREATE TABLE IF NOT EXISTS {self.table} ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL)"
+            )
+
+    def _lookup(self, key: str) -> Optional[Any]:
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT value, expires_at FROM {self.table} WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            value, expires_at = row
+            if expires_at is not None and expires_at < time.time():
+                with self._conn:
+                    self._conn.execute(f"DELETE FROM {self.table} WHERE key = ?", (key,))
+                return None
+        return loads(value)
+
+    def get(self, key: str) -> Optional[Any]:
+        return self._record(self._lookup(key))
+
+    def set(self, key: str, value: Any) -> None:
+        expires_at = time.time() + self.ttl_seconds if self.ttl_seconds else None
+        payload = dumps_str(value)
+        with self._lock, self._conn:
+            self._conn.execute(
+                f"INSERT OR REPLACE INTO {self.table} (key, value, expires_at) VALUES (?, ?, ?)",
+                (key, payload, expires_at)
+            )
+
+    def clear(self) -> None:
+        with self._lock, self._conn:
+            self._conn.execute(f"DELETE FROM {self.table}")
+
+    async def aget(self, key: str) -> Optional[Any]:
+        return await asyncio.to_thread(self.get, key)
+
+    async def aset(self, key: str, value: Any) -> None:
+        await asyncio.to_thread(self.set, key, value)
+
+
+class TieredCache(CacheBackend):
+    """Checks layers in order and back-fills faster layers on a hit"""
+    def __init__(self, layers: List[CacheBackend]):
+        super().__init__()
+        self.layers = layers
+
+    def get(self, key: str) -> Optional[Any]:
+        for index, layer in enumerate(self.layers):
+            value = layer.get(key)
+            if value is not None:
+                for upper in self.layers[:index]:
+                    upper.set(key, value)
+                return self._record(value)
+        return self._record(None)
+
+    def set(self, key: str, value: Any) -> None:
+        for layer in self.layers:
+            layer.set(key, value)
+
+    def clear(self) -> None:
+        for layer in self.layers:
+            layer.clear()
+
+    async def aget(self, key: str) -> Optional[Any]:
+        for index, layer in enumerate(self.layers):
+            value = await layer.aget(key)
+            if value is not None:
+                for upper in self.layers[:index]:
+                    await upper.aset(key, value)
+                return self._record(value)
+        return self._record(None)
+
+    async def aset(self, key: str, value: Any) -> None:
+        for layer in self.layers:
+            await layer.aset(key, value)
+
+    def stats(self) -> Dict[str, Any]:
+        stats = super().stats()
+        stats["layers"] = [layer.stats() for layer in self.layers]
+        return stats
+
+
+def build_cache(
+    max_size: int,
+    ttl_seconds: Optional[float],
+    sqlite_path: Optional[str] = None,
+    table: str = "cache"
+) -> CacheBackend:
+    """Create an in-memory cache, optionally fronting a SQLite layer"""
+    memory = MemoryCache(max_size=max_size, ttl_seconds=ttl_seconds)
+    if not sqlite_path:
+        return memory
+    return TieredCache([memory, SQLiteCache(sqlite_path, table=table, ttl_seconds=ttl_seconds)])
@@ -66,4 +66,87 @@ class TimeoutException(MarketingAgentException):
             message=f"Operation '{operation}' timed out after {timeout} seconds",
             error_code="TIMEOUT_ERROR",
             details=details
+        )
+
+class JobQueueFullException(MarketingAgentException):
+    """Exception raised when the background job queue cannot accept more work"""
+    def __init__(
+        self,
+        max_queue_size: int,
+        details: Optional[Dict[str, Any]] = None
+    ):
+        super().__init__(
+            message=f"Job queue is full ({max_queue_size} jobs waiting)",
+            error_code="QUEUE_FULL",
+            details=details
+        )
+
+class TokenBudgetExceededException(MarketingAgentException):
+    """Exception raised when an agent call would exceed the request's token budget"""
+    def __init__(
+        self,
+        agent_type: str,
+        required: int,
+        remaining: int,
+        details: Optional[Dict[str, Any]] = None
+    ):
+        super().__init__(
+            message=f"{agent_type} needs about {required} tokens but only {remaining} remain in the token budget",
+            error_code="TOKEN_BUDGET_EXCEEDED",
+            details=details
+        )
+
+class CircuitOpenException(MarketingAgentException):
+    """Exception raised when a call is refused because its circuit breaker is open"""
+    def __init__(
+        self,
+        breaker: str,
+        retry_after: float,
+        details: Optional[Dict[str, Any]] = None
+    ):
+        super().__init__(
+            message=f"Circuit '{breaker}' is open; retry in {retry_after:.1f} seconds",
+            error_code="CIRCUIT_OPEN",
+            details=details
+        )
+
+class CheckpointNotFoundException(MarketingAgentException):
+    """Exception raised when no checkpointed workflow exists for a request"""
+    def __init__(
+        self,
+        request_id: str,
+        details: Optional[Dict[str, Any]] = None
+    ):
+        super().__init__(
+            message=f"No checkpointed workflow found for request '{request_id}'",
+            error_code="CHECKPOINT_NOT_FOUND",
+            details=details
+        )
+
+class RequestConflictException(MarketingAgentException):
+    """Exception raised when a request_id is reused for a different request"""
+    def __init__(
+        self,
+        request_id: str,
+        details: Optional[Dict[str, Any]] = None
+    ):
+        super().__init__(
+            message=f"Request '{request_id}' already has a checkpointed workflow for a different prompt or response depth",
+            error_code="REQUEST_CONFLICT",
+            details=details
+        )
+
+class FakeLLMException(MarketingAgentException):
+    """Exception raised by the fake LLM backend to simulate an upstream API error"""
+    def __init__(
+        self,
+        status_code: int,
+        details: Optional[Dict[str, Any]] = None
+    ):
+        # Read by the retry and circuit breaker logic like an OpenAI APIStatusError
+        self.status_code = status_code
+        super().__init__(
+            message=f"Simulated LLM API error (HTTP {status_code})",
+            error_code="FAKE_LLM_ERROR",
+            details=details
         )
\ No newline at end of file
@@ -0,0 +1,240 @@
+import asyncio
+import hashlib
+import math
+import random
+import re
+import threading
+import time
+from collections import Counter
+from typing import Any, Dict, List, Optional, Tuple, Type, Union, get_args, get_origin
+
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+from pydantic import BaseModel, ConfigDict, PrivateAttr
+
+from models.pydantic_models import (
+    AdvertisingResponse,
+    AnalyticsResponse,
+    ContentResponse,
+    Department,
+    EmailResponse,
+    FinalResponse,
+    SEOResponse,
+    SocialMediaResponse,
+    StrategyResponse,
+    SummarizerResponse,
+    TaskBreakdown
+)
+from utils.exceptions import FakeLLMException
+from utils.serialization import dumps_str
+from utils.tokens import count_message_tokens, count_tokens, truncate_tokens
+
+# Phrases of the CEO and summarizer prompts that identify which call is being made
+CALL_MARKERS = [
+    ("determine which departments should be involved", "select_departments"),
+    ("Create a comprehensive final marketing plan", "final_response"),
+    ("Review and integrate the following department responses", "summarizer")
+]
+# Department agents are recognised by the title in their role description
+DEPARTMENT_SCHEMAS: Dict[str, Tuple[str, Type[BaseModel]]] = {
+    "SEO Manager": ("seo", SEOResponse),
+    "Content Marketing Manager": ("content", ContentResponse),
+    "Digital Strategy Manager": ("strategy", StrategyResponse),
+    "Advertising Manager": ("advertising", AdvertisingResponse),
+    "Social Media Manager": ("social", SocialMediaResponse),
+    "Email Marketing Manager": ("email", EmailResponse),
+    "Analytics Manager": ("analytics", AnalyticsResponse)
+}
+DEPARTMENT_LINE = re.compile(r"^\s*- (\w+): ", re.MULTILINE)
+
+
+def sample_value(annotation: Any, label: str, rng: random.Random, items: int) -> Any:
+    """Generate a placeholder value of the given type annotation"""
+    origin = get_origin(annotation)
+    args = get_args(annotation)
+    if origin is Union:
+        return sample_value(next(arg for arg in args if arg is not type(None)), label, rng, items)
+    if isinstance(annotation, type) and issubclass(annotation, BaseModel):
+        return sample_model(annotation, rng, items)
+    if origin is list:
+        return [sample_value(args[0], f"{label} {i}", rng, items) for i in range(1, items + 1)]
+    if origin is dict:
+        return {f"{label} {i}": sample_value(args[1], f"{label} {i}", rng, items) for i in range(1, items + 1)}
+    if annotation is float:
+        return round(rng.uniform(1, 100), 1)
+    if annotation is int:
+        return rng.randint(1, 5)
+    return f"Placeholder {label} for the marketing plan"
+
+
+def sample_model(model: Type[BaseModel], rng: random.Random, items: int, exclude: Tuple[str, ...] = ()) -> Dict[str, Any]:
+    """Generate a JSON-ready dict with every field of a pydantic model filled in"""
+    return {
+        name: sample_value(field.annotation, name.replace("_", " "), rng, items)
+        for name, field in model.model_fields.items()
+        if name not in exclude
+    }
+
+
+class FakeChatModel(BaseChatModel):
+    """
+    Offline stand-in for ChatOpenAI that returns canned JSON.
+
+    Each call sleeps for a sampled time to first token plus the completion
+    length at tokens_per_second, may fail with FakeLLMException to exercise
+    retries and breakers, and reports token usage like the real model. The
+    output matches the schema of the agent that made the call, recognised
+    from its prompt. With a seed, the n-th call with a given prompt always
+    behaves the same regardless of scheduling.
+    """
+    model_name: str = "fake"
+    max_tokens: Optional[int] = None
+    latency_distribution: str = "lognormal"
+    latency_seconds: float = 0.5
+    latency_jitter: float = 0.25
+    latencies: Dict[str, float] = {}
+    tokens_per_second: float = 0.0
+    failure_rate: float = 0.0
+    failure_status: int = 503
+    list_items: int = 3
+    department_count: Optional[int] = None
+    seed: Optional[int] = None
+
+    model_config = ConfigDict(protected_namespaces=())
+
+    _calls: Counter = PrivateAttr(default_factory=Counter)
+    _lock: Any = PrivateAttr(default_factory=threading.Lock)
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake-chat"
+
+    @property
+    def _identifying_params(self) -> Dict[str, Any]:
+        return {"model_name": self.model_name, "seed": self.seed}
+
+    def _rng(self, prompt: str) -> random.Random:
+        if self.seed is None:
+            return random.Random()
+        digest = hashlib.sha256(prompt.encode("utf-8")).hexdigest()
+        with self._lock:
+            self._calls[digest] += 1
+            call = self._calls[digest]
+        return random.Random(f"{self.seed}:{digest}:{call}")
+
+    @staticmethod
+    def _role(prompt: str) -> Tuple[str, Optional[Type[BaseModel]]]:
+        """Name of the call (used for per-role latencies) and the schema of its output"""
+        for marker, role in CALL_MARKERS:
+            if marker in prompt:
+                return role, None
+        for title, (code, schema) in DEPARTMENT_SCHEMAS.items():
+            if title in prompt:
+                return code, schema
+        return "unknown", None
+
+    def _select_departments(self, prompt: str, rng: random.Random) -> Dict[str, Any]:
+        codes = DEPARTMENT_LINE.findall(prompt)
+        count = len(codes) if self.department_count is None else min(self.department_count, len(codes))
+        chosen = rng.sample(codes, count)
+        breakdown = TaskBreakdown(
+            selected_departments={
+                code: Department(
+                    justification=f"The request needs {code} expertise",
+                    task=f"Prepare the {code} plan for the request",
+                    # Department priorities only range from 1 to 5
+                    priority=min(priority, 5)
+                )
+                for priority, code in enumerate(chosen, start=1)
+            },
+            priority_order=chosen
+        )
+        return breakdown.model_dump()
+
+    def _respond(self, prompt: str, rng: random.Random) -> Tuple[str, str]:
+        role, schema = self._role(prompt)
+        if role == "select_departments":
+            payload = self._select_departments(prompt, rng)
+        elif role == "summarizer":
+            payload = sample_model(SummarizerResponse, rng, self.list_items)
+        elif role == "final_response":
+            payload = sample_model(FinalResponse, rng, self.list_items, exclude=("request_id", "timestamp"))
+        elif schema is not None:
+            payload = sample_model(schema, rng, self.list_items)
+        else:
+            payload = {"response": "Placeholder response"}
+        return role, dumps_str(payload)
+
+    def _time_to_first_token(self, role: str, rng: random.Random) -> float:
+        mean = self.latencies.get(role, self.latency_seconds)
+        if self.latency_distribution == "fixed":
+            return mean
+        if self.latency_distribution == "uniform":
+            return max(0.0, rng.uniform(mean - self.latency_jitter, mean + self.latency_jitter))
+        if self.latency_distribution == "normal":
+            return max(0.0, rng.gauss(mean, self.latency_jitter))
+        if self.latency_distribution == "lognormal":
+            # Parameterised so the mean stays at `mean` whatever the spread
+            if mean <= 0:
+                return 0.0
+            return rng.lognormvariate(math.log(mean) - self.latency_jitter ** 2 / 2, self.latency_jitter)
+        raise ValueError(f"Unknown latency distribution: {self.latency_distribution}")
+
+    def _plan(self, messages: List[BaseMessage], max_tokens: Optional[int]) -> Tuple[ChatResult, float, Optional[int]]:
+        """Build the response and decide its delay and whether it fails"""
+        prompt = "\n".join(str(message.content) for message in messages)
+        rng = self._rng(prompt)
+        role, content = self._respond(prompt, rng)
+        prompt_tokens = count_message_tokens(messages, self.model_name)
+        completion_tokens = count_tokens(content, self.model_name)
+        limit = max_tokens or self.max_tokens
+        generated = min(completion_tokens, limit) if limit else completion_tokens
+        # Like the real API, a completion that hits max_tokens is cut off mid-output
+        finish_reason = "stop"
+        if generated < completion_tokens:
+            content = truncate_tokens(content, generated, self.model_name)
+            finish_reason = "length"
+
+        delay = self._time_to_first_token(role, rng)
+        # Failed calls return an error status instead of streaming a completion
+        failure = self.failure_status if rng.random() < self.failure_rate else None
+        if failure is None and self.tokens_per_second > 0:
+            delay += generated / self.tokens_per_second
+
+        message = AIMessage(
+            content=content,
+            usage_metadata={
+                "input_tokens": prompt_tokens,
+                "output_tokens": generated,
+                "total_tokens": prompt_tokens + generated
+            },
+            response_metadata={"model_name": self.model_name, "finish_reason": finish_reason}
+        )
+        return ChatResult(generations=[ChatGeneration(message=message)]), delay, failure
+
+    def _generate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Any = None,
+        **kwargs: Any
+    ) -> ChatResult:
+        result, delay, failure = self._plan(messages, kwargs.get("max_tokens"))
+        time.sleep(delay)
+        if failure is not None:
+            raise FakeLLMException(failure)
+        return result
+
+    async def _agenerate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Any = None,
+        **kwargs: Any
+    ) -> ChatResult:
+        result, delay, failure = self._plan(messages, kwargs.get("max_tokens"))
+        await asyncio.sleep(delay)
+        if failure is not None:
+            raise FakeLLMException(failure)
+        return result
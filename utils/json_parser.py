@@ -0,0 +1,145 @@
+import re
+from typing import Any, Dict, List, Optional, Tuple
+
+import orjson
+
+_CLOSERS = {"{": "}", "[": "]"}
+_FENCE = re.compile(r"```[a-zA-Z0-9_-]*[ \t]*\r?\n?(.*?)(?:```|\Z)", re.DOTALL)
+# How many earlier element boundaries to try when repairing truncated output
+_MAX_TRUNCATION_CUTS = 8
+
+
+class ParseResult:
+    """
+    Outcome of parsing LLM output as a JSON object.
+
+    outcome is "fast" when the text was valid JSON, "repaired" when the
+    tolerant fallback recovered it, and "failed" otherwise; failures carry
+    the reason and the raw text instead of silently returning None.
+    truncated is set when the repair had to close cut-off output, so the
+    value may be missing fields the model never got to write.
+    """
+    __slots__ = ("value", "outcome", "error", "raw", "truncated")
+
+    def __init__(
+        self,
+        value: Optional[Dict[str, Any]],
+        outcome: str,
+        error: Optional[str] = None,
+        raw: str = "",
+        truncated: bool = False
+    ):
+        self.value = value
+        self.outcome = outcome
+        self.error = error
+        self.raw = raw
+        self.truncated = truncated
+
+    @property
+    def ok(self) -> bool:
+        return self.outcome != "failed"
+
+    def as_error(self) -> Dict[str, Any]:
+        """Error payload in the shape agents return for failed calls"""
+        return {
+            "error": "Invalid JSON response",
+            "status": "failed",
+            "reason": self.error,
+            "raw_response": self.raw
+        }
+
+
+def _close(body: str, stack: List[str]) -> str:
+    return body.rstrip().rstrip(",") + "".join(_CLOSERS[opener] for opener in reversed(stack))
+
+
+def _repair(text: str) -> Tuple[Optional[Any], bool]:
+    """
+    Parse the first JSON value in text, tolerating trailing commas and truncation.
+
+    Returns the value (None when nothing parses) and whether it was
+    recovered from truncated output.
+
+    The scan is string-aware: it drops commas directly before a closing
+    bracket, stops at the end of the first complete value, and for
+    truncated output closes open strings and brackets, backing off to
+    earlier element boundaries if the last element is incomplete.
+    """
+    starts = [index for index in (text.find("{"), text.find("[")) if index >= 0]
+    if not starts:
+        return None, False
+
+    out: List[str] = []
+    stack: List[str] = []
+    cuts: List[Tuple[int, List[str]]] = []
+    in_string = False
+    escaped = False
+    for char in text[min(starts):]:
+        if in_string:
+            out.append(char)
+            if escaped:
+                escaped = False
+            elif char == "\\":
+                escaped = True
+            elif char == '"':
+                in_string = False
+        elif char == '"':
+            in_string = True
+            out.append(char)
+        elif char in _CLOSERS:
+            stack.append(char)
+            out.append(char)
+        elif char in "}]":
+            while out and out[-1].isspace():
+                out.pop()
+            if out and out[-1] == ",":
+                out.pop()
+            if stack:
+                stack.pop()
+            out.append(char)
+            if not stack:
+                try:
+                    return orjson.loads("".join(out)), False
+                except orjson.JSONDecodeError:
+                    return None, False
+        elif char == ",":
+            cuts.append((len(out), list(stack)))
+            out.append(char)
+        else:
+            out.append(char)
+
+    # Truncated output: close what is open, then back off element by element
+    body = "".join(out)
+    attempts = [(body + '"' if in_string else body, stack)]
+    attempts += [(body[:position], open_stack) for position, open_stack in reversed(cuts[-_MAX_TRUNCATION_CUTS:])]
+    for candidate, open_stack in attempts:
+        try:
+            return orjson.loads(_close(candidate, open_stack)), True
+        except orjson.JSONDecodeError:
+            continue
+    return None, False
+
+
+def parse_json_output(text: str) -> ParseResult:
+    """Parse LLM output into a JSON object, trying orjson first and repairing on failure"""
+    if not isinstance(text, str):
+        text = str(text)
+    try:
+        value = orjson.loads(text)
+        if isinstance(value, dict):
+            return ParseResult(value, "fast", None, text)
+    except orjson.JSONDecodeError:
+        pass
+
+    fence = _FENCE.search(text)
+    for candidate in ([fence.group(1)] if fence else []) + [text]:
+        value, truncated = _repair(candidate)
+        # Prose may put a bracket before the object, e.g. "the [3] departments: {...}"
+        brace = candidate.find("{")
+        if not isinstance(value, dict) and brace > 0:
+            value, truncated = _repair(candidate[brace:])
+        if isinstance(value, dict):
+            return ParseResult(value, "repaired", None, text, truncated)
+
+    reason = "no JSON object found" if "{" not in text else "malformed JSON object"
+    return ParseResult(None, "failed", reason, text)
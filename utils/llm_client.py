@@ -0,0 +1,124 @@
+import asyncio
+import json
+import threading
+from typing import TYPE_CHECKING, Any, Dict, Optional
+
+import httpx
+
+from config.settings import get_settings
+from utils.rate_limiter import reset_rate_limiters
+
+if TYPE_CHECKING:
+    from langchain_core.language_models.chat_models import BaseChatModel
+    from langchain_openai import ChatOpenAI
+    from utils.fake_llm import FakeChatModel
+
+settings = get_settings()
+
+_lock = threading.Lock()
+_http_async_client: Optional[httpx.AsyncClient] = None
+_chat_models: Dict[str, "BaseChatModel"] = {}
+_llm_semaphore: Optional[asyncio.Semaphore] = None
+
+
+def get_http_async_client() -> httpx.AsyncClient:
+    """Return the process-wide async HTTP client shared by all LLM calls"""
+    global _http_async_client
+    with _lock:
+        if _http_async_client is None or _http_async_client.is_closed:
+            _http_async_client = httpx.AsyncClient(
+                limits=httpx.Limits(
+                    max_connections=settings.OPENAI_MAX_CONNECTIONS,
+                    max_keepalive_connections=settings.OPENAI_MAX_KEEPALIVE_CONNECTIONS,
+                    keepalive_expiry=settings.OPENAI_KEEPALIVE_EXPIRY
+                ),
+                timeout=httpx.Timeout(
+                    settings.OPENAI_REQUEST_TIMEOUT,
+                    connect=settings.OPENAI_CONNECT_TIMEOUT
+                )
+            )
+        return _http_async_client
+
+
+def get_chat_model(api_key: str, **overrides: Any) -> "BaseChatModel":
+    """
+    Return a shared chat model instance for the given configuration.
+
+    Agents with identical model settings borrow the same instance, so they
+    also share its underlying OpenAI client and connection pool. With
+    LLM_BACKEND="fake" an offline FakeChatModel is returned instead.
+    """
+    config = {**settings.get_openai_config(), **overrides}
+    key = json.dumps(config, sort_keys=True)
+    with _lock:
+        model = _chat_models.get(key)
+    if model is not None:
+        return model
+
+    backend = settings.LLM_BACKEND.lower()
+    if backend == "fake":
+        model = _build_fake_model(config)
+    elif backend == "openai":
+        model = _build_openai_model(api_key, config)
+    else:
+        raise ValueError(f"Unknown LLM_BACKEND: {settings.LLM_BACKEND}")
+    with _lock:
+        return _chat_models.setdefault(key, model)
+
+
+def _build_openai_model(api_key: str, config: Dict[str, Any]) -> "ChatOpenAI":
+    # Imported on first use so importing this module stays cheap
+    from langchain_openai import ChatOpenAI
+
+    return ChatOpenAI(
+        openai_api_key=api_key,
+        model_name=config["model"],
+        temperature=config["temperature"],
+        max_tokens=config["max_tokens"],
+        frequency_penalty=config["frequency_penalty"],
+        presence_penalty=config["presence_penalty"],
+        top_p=config["top_p"],
+        max_retries=settings.OPENAI_MAX_RETRIES,
+        http_async_client=get_http_async_client()
+    )
+
+
+def _build_fake_model(config: Dict[str, Any]) -> "FakeChatModel":
+    # Kept out of the import path of production deployments
+    from utils.fake_llm import FakeChatModel
+
+    return FakeChatModel(
+        model_name=config["model"],
+        max_tokens=config["max_tokens"],
+        latency_distribution=settings.FAKE_LLM_LATENCY_DISTRIBUTION,
+        latency_seconds=settings.FAKE_LLM_LATENCY_SECONDS,
+        latency_jitter=settings.FAKE_LLM_LATENCY_JITTER,
+        latencies=settings.FAKE_LLM_LATENCIES,
+        tokens_per_second=settings.FAKE_LLM_TOKENS_PER_SECOND,
+        failure_rate=settings.FAKE_LLM_FAILURE_RATE,
+        failure_status=settings.FAKE_LLM_FAILURE_STATUS,
+        list_items=settings.FAKE_LLM_LIST_ITEMS,
+        department_count=settings.FAKE_LLM_DEPARTMENTS,
+        seed=settings.FAKE_LLM_SEED
+    )
+
+
+def get_llm_semaphore() -> asyncio.Semaphore:
+    """Return the process-wide semaphore capping concurrent LLM calls"""
+    global _llm_semaphore
+    if _llm_semaphore is None:
+        _llm_semaphore = asyncio.Semaphore(settings.LLM_MAX_CONCURRENCY)
+    return _llm_semaphore
+
+
+async def close_llm_clients() -> None:
+    """Close the shared connection pool and forget cached chat models and limiters"""
+    global _http_async_client, _llm_semaphore
+    with _lock:
+        client = _http_async_client
+        _http_async_client = None
+        _chat_models.clear()
+        _llm_semaphore = None
+    reset_rate_limiters()
+    if client is not None and not client.is_closed:
+        await client.aclose()
@@ -1,58 +1,118 @@
+import atexit
 import logging
-import json
+import logging.handlers
+import queue
+import threading
 from datetime import datetime
 import os
 from typing import Any, Dict, Optional
+from utils.serialization import dumps_str
+
+class LazyJSON:
+    """Log argument that serializes its payload only for records that pass the level check"""
+    __slots__ = ("payload",)
+
+    def __init__(self, payload: Any):
+        self.payload = payload
+
+    def __str__(self) -> str:
+        return dumps_str(self.payload)
 
 class MarketingLogger:
+    """
+    Application logger whose handlers are set up on first use.
+
+    Creating the log directory, opening the log file and starting the writer
+    thread are deferred until something is logged, so importing a module
+    that logs costs nothing at startup.
+    """
     def __init__(self):
-        # Create logs directory if it doesn't exist
-        if not os.path.exists('logs'):
-            os.makedirs('logs')
+        self.listener: Optional[logging.handlers.QueueListener] = None
+        self._listening = False
+        self._setup_lock = threading.Lock()
+
+    @property
+    def logger(self) -> logging.Logger:
+        """The configured 'marketing_agents' logger"""
+        if self.listener is None:
+            self._configure()
+        return logging.getLogger('marketing_agents')
+
+    def _configure(self) -> None:
+        with self._setup_lock:
+            if self.listener is not None:
+                return
+
+            # Create logs directory if it doesn't exist
+            if not os.path.exists('logs'):
+                os.makedirs('logs')
+
+            # Set up logging
+            logger = logging.getLogger('marketing_agents')
+            logger.setLevel(os.getenv("LOG_LEVEL", "INFO").upper())
+
+            # Create handlers
+            console_handler = logging.StreamHandler()
+            file_handler = logging.FileHandler('logs/marketing_agents.log')
+
+            # Create formatters and add it to handlers
+            log_format = logging.Formatter('%(asctime)s - %(levelname)s - %(message)s')
+            console_handler.setFormatter(log_format)
+            file_handler.setFormatter(log_format)
 
-        # Set up logging
-        self.logger = logging.getLogger('marketing_agents')
-        self.logger.setLevel(logging.INFO)
+            # Hand records to a background thread so callers never block on I/O
+            log_queue: queue.SimpleQueue = queue.SimpleQueue()
+            listener = logging.handlers.QueueListener(
+                log_queue,
+                console_handler,
+                file_handler,
+                respect_handler_level=True
+            )
+            listener.start()
+            self._listening = True
+            atexit.register(self.stop)
 
-        # Create handlers
-        console_handler = logging.StreamHandler()
-        file_handler = logging.FileHandler('logs/marketing_agents.log')
+            # Add the queue handler to the logger
+            logger.addHandler(logging.handlers.QueueHandler(log_queue))
+            self.listener = listener
 
-        # Create formatters and add it to handlers
-        log_format = logging.Formatter('%(asctime)s - %(levelname)s - %(message)s')
-        console_handler.setFormatter(log_format)
-        file_handler.setFormatter(log_format)
+    def stop(self) -> None:
+        """Flush queued records and stop the background writer thread"""
+        if self._listening:
+            self._listening = False
+            self.listener.stop()
 
-        # Add handlers to the logger
-        self.logger.addHandler(console_handler)
-        self.logger.addHandler(file_handler)
+    def log_payload(self, message: str, payload: Any, level: int = logging.DEBUG) -> None:
+        """Log a structured payload, serializing it only if the level is enabled"""
+        if self.logger.isEnabledFor(level):
+            self.logger.log(level, "%s: %s", message, dumps_str(payload, indent=True))
 
     def log_request(self, request_id: str, prompt: str) -> None:
         """Log incoming request"""
-        self.logger.info(f"New request {request_id}: {prompt}")
+        self.logger.info("New request %s: %s", request_id, prompt)
 
     def log_agent_start(self, request_id: str, agent_name: str) -> None:
         """Log when an agent starts processing"""
-        self.logger.info(f"Request {request_id}: {agent_name} started processing")
+        self.logger.info("Request %s: %s started processing", request_id, agent_name)
 
     def log_agent_completion(self, request_id: str, agent_name: str, response: Dict[str, Any]) -> None:
         """Log when an agent completes processing"""
-        self.logger.info(f"Request {request_id}: {agent_name} completed")
-        self.logger.debug(f"Response from {agent_name}: {json.dumps(response, indent=2)}")
+        self.logger.info("Request %s: %s completed", request_id, agent_name)
+        self.log_payload(f"Response from {agent_name}", response)
 
     def log_agent_error(self, request_id: str, agent_name: str, error: str) -> None:
         """Log agent errors"""
-        self.logger.error(f"Request {request_id}: {agent_name} failed - {error}")
+        self.logger.error("Request %s: %s failed - %s", request_id, agent_name, error)
 
     def log_workflow_step(self, request_id: str, step: str, details: Optional[Dict[str, Any]] = None) -> None:
         """Log workflow progress"""
-        message = f"Request {request_id}: Workflow step '{step}'"
         if details:
-            message += f" - {json.dumps(details)}"
-        self.logger.info(message)
+            self.logger.info("Request %s: Workflow step '%s' - %s", request_id, step, LazyJSON(details))
+        else:
+            self.logger.info("Request %s: Workflow step '%s'", request_id, step)
 
     def log_error(self, request_id: str, error: str) -> None:
         """Log general errors"""
-        self.logger.error(f"Request {request_id}: Error - {error}")
+        self.logger.error("Request %s: Error - %s", request_id, error)
 
-logger = MarketingLogger()
\ No newline at end of file
+logger = MarketingLogger()
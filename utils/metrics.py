@@ -0,0 +1,248 @@
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+DEFAULT_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 20.0, 30.0, 60.0, 120.0)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: Optional[Tuple[str, str]] = None) -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(f'{extra[0]}="{extra[1]}"')
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class Metric:
+    """Base class for a labelled metric rendered in Prometheus text format"""
+    type_name = "untyped"
+
+    def __init__(self, name: str, documentation: str, label_names: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(label_names)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> Tuple[str, ...]:
+        if set(labels) != set(self.label_names):
+            raise ValueError(f"{self.name} expects labels {self.label_names}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.label_names)
+
+    def samples(self) -> List[str]:
+        raise NotImplementedError
+
+    def render(self) -> str:
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.type_name}",
+            *self.samples()
+        ]
+        return "\n".join(lines)
+
+
+class Counter(Metric):
+    """Monotonically increasing value"""
+    type_name = "counter"
+
+    def __init__(self, name: str, documentation: str, label_names: Sequence[str] = ()):
+        super().__init__(name, documentation, label_names)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        if amount < 0:
+            raise ValueError("Counters can only increase")
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels: str) -> float:
+        return self._values.get(self._key(labels), 0.0)
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return [
+            f"{self.name}{_format_labels(self.label_names, key)} {_format_value(value)}"
+            for key, value in items
+        ]
+
+
+class Gauge(Counter):
+    """Value that can go up and down"""
+    type_name = "gauge"
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def dec(self, amount: float = 1.0, **labels: str) -> None:
+        self.inc(-amount, **labels)
+
+    def set(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    @contextmanager
+    def track_inprogress(self, **labels: str) -> Iterator[None]:
+        self.inc(**labels)
+        try:
+            yield
+        finally:
+            self.dec(**labels)
+
+
+class Histogram(Metric):
+    """Cumulative bucketed distribution of observed values"""
+    type_name = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        label_names: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS
+    ):
+        super().__init__(name, documentation, label_names)
+        self.buckets = tuple(sorted(buckets))
+        self._series: Dict[Tuple[str, ...], List[float]] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            # Per-bucket counts followed by the overflow bucket, sum and count
+            series = self._series.setdefault(key, [0.0] * (len(self.buckets) + 3))
+            series[index] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    @contextmanager
+    def time(self, **labels: str) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            items = sorted((key, list(series)) for key, series in self._series.items())
+        lines = []
+        for key, series in items:
+            cumulative = 0.0
+            for bound, count in zip((*self.buckets, float("inf")), series):
+                cumulative += count
+                labels = _format_labels(self.label_names, key, ("le", _format_value(bound)))
+                lines.append(f"{self.name}_bucket{labels} {_format_value(cumulative)}")
+            labels = _format_labels(self.label_names, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(series[-2])}")
+            lines.append(f"{self.name}_count{labels} {_format_value(series[-1])}")
+        return lines
+
+
+class MetricsRegistry:
+    """Collection of metrics exposed together on /metrics"""
+    def __init__(self):
+        self._metrics: Dict[str, Metric] = {}
+
+    def register(self, metric: Metric) -> Metric:
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric {metric.name} is already registered")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str, label_names: Sequence[str] = ()) -> Counter:
+        return self.register(Counter(name, documentation, label_names))
+
+    def gauge(self, name: str, documentation: str, label_names: Sequence[str] = ()) -> Gauge:
+        return self.register(Gauge(name, documentation, label_names))
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        label_names: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS
+    ) -> Histogram:
+        return self.register(Histogram(name, documentation, label_names, buckets))
+
+    def render(self) -> str:
+        """Render all metrics in the Prometheus text exposition format"""
+        return "\n".join(metric.render() for metric in self._metrics.values()) + "\n"
+
+
+registry = MetricsRegistry()
+
+WORKFLOW_NODE_LATENCY = registry.histogram(
+    "marketing_workflow_node_duration_seconds",
+    "Time spent in each workflow node",
+    ["node"]
+)
+WORKFLOW_REQUESTS = registry.counter(
+    "marketing_workflow_requests_total",
+    "Workflow executions by outcome",
+    ["status"]
+)
+WORKFLOWS_IN_FLIGHT = registry.gauge(
+    "marketing_workflows_in_flight",
+    "Workflow executions currently running"
+)
+LLM_CALL_LATENCY = registry.histogram(
+    "marketing_llm_call_duration_seconds",
+    "Latency of LLM calls made by each agent",
+    ["agent"]
+)
+AGENT_ERRORS = registry.counter(
+    "marketing_agent_errors_total",
+    "Failed agent calls",
+    ["agent"]
+)
+LLM_TOKENS = registry.counter(
+    "marketing_llm_tokens_total",
+    "LLM tokens consumed by each agent",
+    ["agent", "type"]
+)
+JSON_PARSE_RESULTS = registry.counter(
+    "marketing_json_parse_total",
+    "Agent output parse outcomes (fast, repaired, failed)",
+    ["agent", "outcome"]
+)
+LLM_TIMEOUTS = registry.counter(
+    "marketing_llm_timeouts_total",
+    "Agent calls abandoned after their deadline",
+    ["agent"]
+)
+LLM_HEDGES = registry.counter(
+    "marketing_llm_hedged_calls_total",
+    "Duplicate LLM calls fired because the first exceeded the hedge delay",
+    ["agent"]
+)
+LLM_RETRIES = registry.counter(
+    "marketing_llm_retries_total",
+    "LLM calls retried after a transient error",
+    ["agent"]
+)
+CIRCUIT_BREAKER_OPEN = registry.gauge(
+    "marketing_circuit_breaker_open",
+    "1 while a circuit breaker is open or half-open, 0 when closed",
+    ["breaker"]
+)
+RATE_LIMIT_WAIT = registry.histogram(
+    "marketing_llm_rate_limit_wait_seconds",
+    "Time LLM calls waited for the local RPM/TPM limiter",
+    ["model"],
+    buckets=(0.01, 0.05, 0.1, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+)
@@ -1,97 +1,201 @@
-from rdflib import Graph, Namespace
-from typing import Dict, List, Optional
-import logging
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Tuple
+import hashlib
+import os
+
+from utils.logger import logger
+from utils.serialization import dumps, loads
+
+MA_NAMESPACE = "http://www.marketing-agents.org/ontology#"
+RDF_ABOUT = "{http://www.w3.org/1999/02/22-rdf-syntax-ns#}about"
+DEFAULT_ONTOLOGY_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "ontology", "agents.owl")
+# Bump when the snapshot layout changes so stale snapshots are rebuilt
+SNAPSHOT_VERSION = 3
+
+# ma: properties collected into lists, keyed as get_agent_details returns them
+LIST_PROPERTIES = {
+    "responsibility": "responsibilities",
+    "tools": "tools",
+    "delegates_to": "delegates_to",
+    "reports_to": "reports_to",
+    "receives_from": "receives_from",
+    "uses": "uses"
+}
+# ma: properties holding a single value
+SCALAR_PROPERTIES = {"description", "output_format", "code", "implementation", "routing_hint"}
+
+
+def _local_name(term: Any) -> str:
+    """Last fragment or path segment of a URI, or the literal itself"""
+    value = str(term)
+    return value.rsplit("#", 1)[-1].rsplit("/", 1)[-1] if "#" in value or "/" in value else value
+
+
+def _file_fingerprint(path: str) -> Dict[str, Any]:
+    stat = os.stat(path)
+    return {"mtime_ns": stat.st_mtime_ns, "size": stat.st_size}
+
+
+def _file_hash(path: str) -> str:
+    with open(path, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
 
 class OWLReader:
-    def __init__(self, owl_file_path: str):
-        self.graph = Graph()
+    """
+    Read-only view of the agent ontology with precomputed lookups.
+
+    The OWL file is parsed once into per-agent indexes, which are saved to a
+    JSON snapshot next to it. Later processes load the snapshot instead of
+    parsing RDF/XML, as long as the OWL file's mtime, or failing that its
+    sha256, still matches.
+    """
+    def __init__(self, owl_file_path: str, snapshot_path: Optional[str] = None):
+        self.owl_file_path = owl_file_path
+        self.snapshot_path = snapshot_path or f"{owl_file_path}.snapshot.json"
+        self._graph = None
         try:
-            self.graph.parse(owl_file_path, format="xml")
-            self.ma = Namespace("http://www.marketing-agents.org/ontology#")
+            self._agents: Dict[str, Dict[str, Any]] = self._load()
         except Exception as e:
-            logging.error(f"Error loading OWL file: {e}")
+            logger.logger.error(f"Error loading OWL file: {e}")
             raise
+        self._reporting = {
+            agent: details["reports_to"][-1]
+            for agent, details in self._agents.items()
+            if details["reports_to"]
+        }
+        self._delegation = {
+            agent: details["delegates_to"]
+            for agent, details in self._agents.items()
+            if details["delegates_to"]
+        }
 
-    def get_agent_details(self, agent_name: str) -> Optional[Dict]:
+    @property
+    def graph(self):
+        """The parsed rdflib graph, loaded on first access for ad-hoc queries"""
+        if self._graph is None:
+            from rdflib import Graph
+            self._graph = Graph()
+            self._graph.parse(self.owl_file_path, format="xml")
+        return self._graph
+
+    def _load(self) -> Dict[str, Dict[str, Any]]:
+        """Load the agent index from the snapshot, rebuilding it when the OWL file changed"""
+        fingerprint = _file_fingerprint(self.owl_file_path)
+        snapshot = self._read_snapshot()
+        if snapshot is not None:
+            source = snapshot["source"]
+            if all(source.get(key) == value for key, value in fingerprint.items()):
+                return snapshot["agents"]
+            # Touched but not edited (e.g. by a checkout): keep the index, refresh the mtime
+            digest = _file_hash(self.owl_file_path)
+            if source.get("sha256") == digest:
+                self._write_snapshot(snapshot["agents"], {**fingerprint, "sha256": digest})
+                return snapshot["agents"]
+
+        agents = self._parse()
+        self._write_snapshot(agents, {**fingerprint, "sha256": _file_hash(self.owl_file_path)})
+        return agents
+
+    def _read_snapshot(self) -> Optional[Dict[str, Any]]:
         try:
-            agent_uri = self.ma[agent_name]
-            query = f"""
-            SELECT ?property ?value
-            WHERE {{
-                ma:{agent_name} ?property ?value .
-            }}
-            """
-            results = self.graph.query(query)
-            
-            if not results:
-                return None
-                
-            agent_details = {
-                "responsibilities": [],
-                "tools": [],
-                "delegates_to": [],
-                "reports_to": [],
-                "receives_from": []
-            }
-            
-            for row in results:
-                prop = str(row.property).split("#")[-1]
-                value = str(row.value)
-                
-                if prop == "responsibility":
-                    agent_details["responsibilities"].append(value)
-                elif prop == "tools":
-                    agent_details["tools"].append(value)
-                elif prop == "delegates_to":
-                    agent_details["delegates_to"].append(value)
-                elif prop == "reports_to":
-                    agent_details["reports_to"].append(value)
-                elif prop == "receives_from":
-                    agent_details["receives_from"].append(value)
-                    
-            return agent_details
-            
-        except Exception as e:
-            logging.error(f"Error retrieving agent details: {e}")
+            with open(self.snapshot_path, "rb") as f:
+                snapshot = loads(f.read())
+        except (OSError, ValueError):
+            return None
+        if not isinstance(snapshot, dict) or snapshot.get("version") != SNAPSHOT_VERSION:
             return None
+        return snapshot
 
-    def get_reporting_chain(self) -> Dict[str, List[str]]:
-        """Returns the reporting structure of agents"""
-        chain = {}
+    def _write_snapshot(self, agents: Dict[str, Dict[str, Any]], source: Dict[str, Any]) -> None:
+        """Persist the index; a read-only checkout only costs a re-parse next time"""
+        payload = dumps({"version": SNAPSHOT_VERSION, "source": source, "agents": agents}, sort_keys=True)
+        temp_path = f"{self.snapshot_path}.{os.getpid()}.tmp"
         try:
-            query = """
-            SELECT ?agent ?reports_to
-            WHERE {
-                ?agent ma:reports_to ?reports_to .
-            }
-            """
-            results = self.graph.query(query)
-            for row in results:
-                agent = str(row[0]).split("#")[-1]
-                reports_to = str(row[1]).split("#")[-1]
-                chain[agent] = reports_to
-            return chain
-        except Exception as e:
-            logging.error(f"Error retrieving reporting chain: {e}")
-            return {}
+            with open(temp_path, "wb") as f:
+                f.write(payload)
+            os.replace(temp_path, self.snapshot_path)
+        except OSError as e:
+            logger.logger.warning(f"Could not write ontology snapshot {self.snapshot_path}: {e}")
+
+    def _parse(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Build the agent index in one pass over the RDF triples.
+
+        Agents are keyed by the local name of their URI, so lookups do not
+        depend on the base URI rdf:about="#..." resolved against.
+        """
+        from rdflib import RDFS
+
+        agents: Dict[str, Dict[str, Any]] = {}
+        for subject, predicate, value in self.graph:
+            name = _local_name(subject)
+            predicate_uri = str(predicate)
+            if predicate_uri.startswith(MA_NAMESPACE):
+                prop = predicate_uri[len(MA_NAMESPACE):]
+            elif predicate == RDFS.subClassOf:
+                prop = "subclass_of"
+            else:
+                continue
+
+            details = agents.setdefault(name, self._empty_details())
+            value = _local_name(value) if prop == "subclass_of" else str(value)
+            if prop in LIST_PROPERTIES:
+                details[LIST_PROPERTIES[prop]].append(value)
+            else:
+                details[prop] = value
+
+        # rdflib does not keep document order; restore it (e.g. the CEO's department list)
+        # and sort anything the XML scan cannot place, so snapshots are stable
+        order = self._document_order()
+        for name, details in agents.items():
+            for prop, key in LIST_PROPERTIES.items():
+                position = order.get((name, prop), [])
+                details[key].sort(key=lambda value: (position.index(value) if value in position else len(position), value))
+        return agents
+
+    def _document_order(self) -> Dict[Tuple[str, str], List[str]]:
+        """Literal ma: property values of each class, in the order the OWL file lists them"""
+        import xml.etree.ElementTree as ElementTree
+
+        prefix = "{" + MA_NAMESPACE + "}"
+        order: Dict[Tuple[str, str], List[str]] = {}
+        for element in ElementTree.parse(self.owl_file_path).getroot().iter():
+            about = element.get(RDF_ABOUT)
+            if about is None:
+                continue
+            for child in element:
+                if child.tag.startswith(prefix) and child.text:
+                    order.setdefault((_local_name(about), child.tag[len(prefix):]), []).append(child.text.strip())
+        return order
+
+    @staticmethod
+    def _empty_details() -> Dict[str, Any]:
+        details: Dict[str, Any] = {key: [] for key in LIST_PROPERTIES.values()}
+        details.update({prop: None for prop in SCALAR_PROPERTIES})
+        return details
+
+    def agent_names(self) -> List[str]:
+        """Names of all classes described in the ontology"""
+        return list(self._agents)
+
+    def get_agent_details(self, agent_name: str) -> Optional[Dict]:
+        """Returns the properties of an agent, or None if the ontology does not define it"""
+        details = self._agents.get(agent_name)
+        if details is None:
+            return None
+        return {key: list(value) if isinstance(value, list) else value for key, value in details.items()}
+
+    def get_reporting_chain(self) -> Dict[str, str]:
+        """Returns the reporting structure of agents"""
+        return dict(self._reporting)
 
     def get_delegation_chain(self) -> Dict[str, List[str]]:
         """Returns delegation structure of agents"""
-        chain = {}
-        try:
-            query = """
-            SELECT ?agent ?delegates_to
-            WHERE {
-                ?agent ma:delegates_to ?delegates_to .
-            }
-            """
-            results = self.graph.query(query)
-            for row in results:
-                agent = str(row[0]).split("#")[-1]
-                if agent not in chain:
-                    chain[agent] = []
-                chain[agent].append(str(row[1]).split("#")[-1])
-            return chain
-        except Exception as e:
-            logging.error(f"Error retrieving delegation chain: {e}")
-            return {}
\ No newline at end of file
+        return {agent: list(delegates) for agent, delegates in self._delegation.items()}
+
+
+@lru_cache(maxsize=None)
+def get_owl_reader(owl_file_path: str = DEFAULT_ONTOLOGY_PATH) -> OWLReader:
+    """Return a shared reader for an ontology file"""
+    return OWLReader(owl_file_path)
@@ -0,0 +1,110 @@
+import asyncio
+import threading
+import time
+from typing import Any, Dict, Optional
+
+from config.settings import get_settings
+
+settings = get_settings()
+
+
+class TokenBucket:
+    """
+    Bucket refilled continuously at a per-minute rate, holding at most one minute of budget.
+
+    The level may go negative when a call turns out to cost more than was
+    admitted; later callers then wait until the debt has been refilled.
+    """
+    def __init__(self, per_minute: int):
+        self.capacity = float(per_minute)
+        self.rate = per_minute / 60.0
+        self.level = self.capacity
+        self.updated = time.monotonic()
+        # Waiters queue on the lock so a large request is not starved by small ones
+        self._lock = asyncio.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+
+    async def acquire(self, amount: float) -> None:
+        """Wait until amount is available and take it"""
+        amount = min(amount, self.capacity)
+        async with self._lock:
+            while True:
+                self._refill()
+                if self.level >= amount:
+                    self.level -= amount
+                    return
+                await asyncio.sleep((amount - self.level) / self.rate)
+
+    def adjust(self, amount: float) -> None:
+        """Give back (positive) or charge (negative) budget after the fact"""
+        self._refill()
+        self.level = min(self.capacity, self.level + amount)
+
+    def available(self) -> float:
+        self._refill()
+        return self.level
+
+
+class RateLimiter:
+    """Requests-per-minute and tokens-per-minute budget for one model"""
+    def __init__(self, model: str, rpm: Optional[int] = None, tpm: Optional[int] = None):
+        self.model = model
+        self.requests = TokenBucket(rpm) if rpm else None
+        self.tokens = TokenBucket(tpm) if tpm else None
+
+    async def acquire(self, estimated_tokens: int) -> float:
+        """Wait for capacity for one call of about estimated_tokens; returns seconds waited"""
+        start = time.perf_counter()
+        if self.requests is not None:
+            await self.requests.acquire(1)
+        if self.tokens is not None:
+            await self.tokens.acquire(estimated_tokens)
+        return time.perf_counter() - start
+
+    def reconcile(self, estimated_tokens: int, actual_tokens: int) -> None:
+        """Correct the token bucket once a call's real usage is known"""
+        if self.tokens is not None:
+            self.tokens.adjust(estimated_tokens - actual_tokens)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "requests_available": round(self.requests.available(), 2) if self.requests else None,
+            "tokens_available": round(self.tokens.available()) if self.tokens else None
+        }
+
+
+_lock = threading.Lock()
+_limiters: Dict[str, Optional[RateLimiter]] = {}
+
+
+def get_rate_limiter(model: str) -> Optional[RateLimiter]:
+    """
+    Return the process-wide limiter for a model, or None when it is unlimited.
+
+    Limits come from LLM_RATE_LIMITS[model] when set, otherwise from
+    LLM_RATE_LIMIT_RPM / LLM_RATE_LIMIT_TPM.
+    """
+    with _lock:
+        if model not in _limiters:
+            limits = settings.LLM_RATE_LIMITS.get(model, {})
+            rpm = limits.get("rpm", settings.LLM_RATE_LIMIT_RPM)
+            tpm = limits.get("tpm", settings.LLM_RATE_LIMIT_TPM)
+            _limiters[model] = RateLimiter(model, rpm, tpm) if rpm or tpm else None
+        return _limiters[model]
+
+
+def rate_limiter_stats() -> Dict[str, Dict[str, Any]]:
+    """Return the remaining budget of every active limiter"""
+    with _lock:
+        limiters = [limiter for limiter in _limiters.values() if limiter is not None]
+    return {limiter.model: limiter.stats() for limiter in limiters}
+
+
+def reset_rate_limiters() -> None:
+    """Forget all limiters, e.g. when the event loop they were used on is closed"""
+    with _lock:
+        _limiters.clear()
@@ -0,0 +1,257 @@
+import asyncio
+import math
+import threading
+import time
+from collections import deque
+from functools import lru_cache
+from typing import TYPE_CHECKING, Any, Awaitable, Callable, Deque, Dict, Optional, Tuple
+
+from utils.exceptions import CircuitOpenException
+
+if TYPE_CHECKING:
+    from tenacity import RetryCallState
+
+# Number of recent latencies kept per call site
+LATENCY_WINDOW = 200
+
+
+class LatencyTracker:
+    """Rolling window of recent call latencies, keyed by call site"""
+    def __init__(self, window: int = LATENCY_WINDOW):
+        self.window = window
+        self._samples: Dict[str, Deque[float]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, key: str, seconds: float) -> None:
+        with self._lock:
+            samples = self._samples.get(key)
+            if samples is None:
+                samples = self._samples[key] = deque(maxlen=self.window)
+            samples.append(seconds)
+
+    def count(self, key: str) -> int:
+        with self._lock:
+            return len(self._samples.get(key, ()))
+
+    def percentile(self, key: str, quantile: float) -> Optional[float]:
+        """Nearest-rank percentile of the window, or None without samples"""
+        with self._lock:
+            samples = sorted(self._samples.get(key, ()))
+        if not samples:
+            return None
+        rank = min(max(math.ceil(quantile * len(samples)), 1), len(samples))
+        return samples[rank - 1]
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """Return sample counts and p50/p95 for every call site"""
+        with self._lock:
+            keys = list(self._samples)
+        return {
+            key: {
+                "samples": self.count(key),
+                "p50": self.percentile(key, 0.5),
+                "p95": self.percentile(key, 0.95)
+            }
+            for key in keys
+        }
+
+
+_latency_tracker = LatencyTracker()
+
+
+def get_latency_tracker() -> LatencyTracker:
+    """Return the process-wide tracker used to pick hedge delays"""
+    return _latency_tracker
+
+
+async def _cancel(tasks) -> None:
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+
+
+async def hedged(
+    call: Callable[[], Awaitable[Any]],
+    hedge_after: Optional[float],
+    on_hedge: Optional[Callable[[], None]] = None
+) -> Any:
+    """
+    Run call, firing one duplicate if it has not finished after hedge_after seconds.
+
+    The first attempt to succeed wins and the other is cancelled. If one
+    attempt fails the other is still awaited, so a hedge never turns a
+    success into a failure. hedge_after=None runs the call once.
+    """
+    if hedge_after is None:
+        return await call()
+
+    primary = asyncio.ensure_future(call())
+    tasks = [primary]
+    try:
+        done, _ = await asyncio.wait({primary}, timeout=hedge_after)
+        if done:
+            return primary.result()
+
+        if on_hedge is not None:
+            on_hedge()
+        tasks.append(asyncio.ensure_future(call()))
+        pending = set(tasks)
+        error: Optional[BaseException] = None
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is None:
+                    await _cancel(pending)
+                    return task.result()
+                error = error or task.exception()
+        raise error
+    except BaseException:
+        # Covers our own cancellation, e.g. by an enclosing timeout; the hedge must not outlive it
+        await _cancel([task for task in tasks if not task.done()])
+        raise
+
+
+async def run_with_timeout(call: Awaitable[Any], timeout: Optional[float], on_timeout: Callable[[], BaseException]) -> Any:
+    """Await call within timeout seconds, raising on_timeout() when it expires"""
+    if not timeout:
+        return await call
+    try:
+        return await asyncio.wait_for(call, timeout)
+    except asyncio.TimeoutError:
+        raise on_timeout() from None
+
+
+
+# Upstream errors worth retrying: rate limits, overload and transient network failures
+RETRYABLE_STATUS_CODES = frozenset({408, 409, 429, 500, 502, 503, 504})
+
+
+@lru_cache(maxsize=None)
+def _retryable_errors() -> Tuple[type, ...]:
+    # Imported on first use; the OpenAI SDK is slow to import
+    import openai
+    return (
+        openai.RateLimitError,
+        openai.APIConnectionError,
+        openai.APITimeoutError,
+        openai.InternalServerError
+    )
+
+
+def is_retryable(error: BaseException) -> bool:
+    """Whether an error is transient, i.e. the same call may succeed if retried"""
+    if isinstance(error, _retryable_errors()):
+        return True
+    status_code = getattr(error, "status_code", None)
+    return isinstance(status_code, int) and status_code in RETRYABLE_STATUS_CODES
+
+
+async def with_retries(
+    call: Callable[[], Awaitable[Any]],
+    attempts: int,
+    initial_wait: float,
+    max_wait: float,
+    on_retry: Optional[Callable[["RetryCallState"], None]] = None
+) -> Any:
+    """
+    Run call, retrying transient errors with jittered exponential backoff.
+
+    Non-retryable errors and the last failed attempt are re-raised as-is.
+    """
+    from tenacity import AsyncRetrying, retry_if_exception, stop_after_attempt, wait_random_exponential
+
+    retrying = AsyncRetrying(
+        stop=stop_after_attempt(max(attempts, 1)),
+        wait=wait_random_exponential(multiplier=initial_wait, max=max_wait),
+        retry=retry_if_exception(is_retryable),
+        before_sleep=on_retry,
+        reraise=True
+    )
+    return await retrying(call)
+
+
+class CircuitBreaker:
+    """
+    Fails calls fast while an upstream keeps failing.
+
+    closed: calls pass and consecutive failures are counted.
+    open: after failure_threshold failures, calls are refused for reset_seconds.
+    half_open: one probe call is let through; success closes the circuit,
+    failure opens it again.
+    """
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, name: str, failure_threshold: int = 5, reset_seconds: float = 30.0):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self.times_opened = 0
+        self._probing = False
+        self._lock = threading.Lock()
+
+    def before_call(self) -> None:
+        """Admit a call or raise CircuitOpenException"""
+        with self._lock:
+            if self.state == self.CLOSED:
+                return
+            retry_after = self.opened_at + self.reset_seconds - time.monotonic()
+            if self.state == self.OPEN and retry_after <= 0:
+                self.state = self.HALF_OPEN
+            if self.state == self.HALF_OPEN and not self._probing:
+                self._probing = True
+                return
+            raise CircuitOpenException(self.name, max(retry_after, 0.0))
+
+    def record_success(self) -> None:
+        with self._lock:
+            self.state = self.CLOSED
+            self.failures = 0
+            self._probing = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self.failures += 1
+            self._probing = False
+            if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+                if self.state != self.OPEN:
+                    self.times_opened += 1
+                self.state = self.OPEN
+                self.opened_at = time.monotonic()
+
+    def release(self) -> None:
+        """End a call without judging the upstream, e.g. when it was cancelled"""
+        with self._lock:
+            self._probing = False
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "state": self.state,
+                "consecutive_failures": self.failures,
+                "times_opened": self.times_opened
+            }
+
+
+_breakers: Dict[str, CircuitBreaker] = {}
+_breakers_lock = threading.Lock()
+
+
+def get_circuit_breaker(name: str, failure_threshold: int = 5, reset_seconds: float = 30.0) -> CircuitBreaker:
+    """Return the process-wide circuit breaker with the given name"""
+    with _breakers_lock:
+        breaker = _breakers.get(name)
+        if breaker is None:
+            breaker = _breakers[name] = CircuitBreaker(name, failure_threshold, reset_seconds)
+        return breaker
+
+
+def circuit_breaker_stats() -> Dict[str, Dict[str, Any]]:
+    """Return the state of every circuit breaker"""
+    with _breakers_lock:
+        breakers = list(_breakers.values())
+    return {breaker.name: breaker.stats() for breaker in breakers}
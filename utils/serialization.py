@@ -0,0 +1,35 @@
+from typing import Any
+
+import orjson
+
+_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+
+
+def _default(obj: Any) -> Any:
+    """Fallback for types orjson does not serialize natively"""
+    if hasattr(obj, "model_dump"):
+        return obj.model_dump()
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+    return str(obj)
+
+
+def dumps(obj: Any, indent: bool = False, sort_keys: bool = False) -> bytes:
+    """Serialize to UTF-8 JSON bytes"""
+    option = _OPTIONS
+    if indent:
+        option |= orjson.OPT_INDENT_2
+    if sort_keys:
+        option |= orjson.OPT_SORT_KEYS
+    return orjson.dumps(obj, default=_default, option=option)
+
+
+def dumps_str(obj: Any, indent: bool = False, sort_keys: bool = False) -> str:
+    """Serialize to a JSON string"""
+    return dumps(obj, indent=indent, sort_keys=sort_keys).decode("utf-8")
+
+
+def loads(data: Any) -> Any:
+    """Parse JSON from bytes or str"""
+    return orjson.loads(data)
+
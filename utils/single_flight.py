@@ -0,0 +1,36 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Tuple
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls that share a key into one execution.
+
+    The first caller for a key starts the work in its own task; callers
+    arriving while it runs await the same task and receive the same result
+    or exception. The task is shielded, so a caller that disconnects does
+    not cancel the work for the others. Keys are forgotten as soon as the
+    work finishes, so this never serves stale results.
+    """
+    def __init__(self):
+        self._calls: Dict[str, asyncio.Future] = {}
+
+    def _forget(self, key: str, task: asyncio.Future) -> None:
+        if self._calls.get(key) is task:
+            del self._calls[key]
+        # Mark the outcome as retrieved even if every caller went away
+        if not task.cancelled():
+            task.exception()
+
+    async def do(self, key: str, call: Callable[[], Awaitable[Any]]) -> Tuple[Any, bool]:
+        """Run call once per key; returns the result and whether it was shared"""
+        task = self._calls.get(key)
+        shared = task is not None
+        if task is None:
+            task = asyncio.ensure_future(call())
+            self._calls[key] = task
+            task.add_done_callback(lambda done: self._forget(key, done))
+        return await asyncio.shield(task), shared
+
+    def in_flight(self) -> int:
+        return len(self._calls)
@@ -0,0 +1,150 @@
+from contextvars import ContextVar
+from functools import lru_cache
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Sequence
+
+from utils.logger import logger
+
+if TYPE_CHECKING:
+    import tiktoken
+
+# Approximate per-message framing overhead of the chat completions format
+TOKENS_PER_MESSAGE = 4
+TOKENS_PER_REPLY = 3
+# Rough characters-per-token ratio used when no encoding can be loaded
+CHARS_PER_TOKEN = 4
+
+
+@lru_cache(maxsize=None)
+def get_encoding(model: str) -> Optional["tiktoken.Encoding"]:
+    """
+    Return the tiktoken encoding for a model, falling back for unknown names.
+
+    Returns None when the encoding cannot be loaded (tiktoken fetches its BPE
+    files on first use), in which case counts are approximated.
+    """
+    try:
+        import tiktoken
+        try:
+            return tiktoken.encoding_for_model(model)
+        except KeyError:
+            return tiktoken.get_encoding("o200k_base" if "4o" in model else "cl100k_base")
+    except Exception as e:
+        logger.logger.warning(f"Falling back to approximate token counts for {model}: {e}")
+        return None
+
+
+def count_tokens(text: str, model: str) -> int:
+    """Count the tokens of a piece of text for the given model"""
+    encoding = get_encoding(model)
+    if encoding is None:
+        return -(-len(text) // CHARS_PER_TOKEN)
+    return len(encoding.encode(text, disallowed_special=()))
+
+
+def truncate_tokens(text: str, tokens: int, model: str) -> str:
+    """Cut text down to its first `tokens` tokens for the given model"""
+    encoding = get_encoding(model)
+    if encoding is None:
+        return text[:tokens * CHARS_PER_TOKEN]
+    return encoding.decode(encoding.encode(text, disallowed_special=())[:tokens])
+
+
+def count_message_tokens(messages: Sequence[Any], model: str) -> int:
+    """Count the prompt tokens of a list of chat messages"""
+    total = TOKENS_PER_REPLY
+    for message in messages:
+        content = message.content if hasattr(message, "content") else str(message)
+        if not isinstance(content, str):
+            content = str(content)
+        total += TOKENS_PER_MESSAGE + count_tokens(content, model)
+    return total
+
+
+class TokenUsage:
+    """Token ledger for one workflow execution, shared by all of its agent calls"""
+    def __init__(self, budget: Optional[int] = None):
+        self.budget = budget
+        self.by_agent: Dict[str, Dict[str, int]] = {}
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self.reserved = 0
+        # Calls the workflow has planned that have not been admitted yet
+        self.pending = 0
+        self.degradations: List[str] = []
+
+    @property
+    def total_tokens(self) -> int:
+        return self.prompt_tokens + self.completion_tokens
+
+    @property
+    def remaining(self) -> Optional[int]:
+        """Tokens left in the budget, or None when the request is unbudgeted"""
+        if self.budget is None:
+            return None
+        return max(self.budget - self.total_tokens - self.reserved, 0)
+
+    def plan(self, calls: int) -> None:
+        """Announce calls that will share the remaining budget, e.g. a department fan-out"""
+        self.pending += calls
+
+    def claim_share(self) -> int:
+        """
+        Admit one planned call and return its share of the remaining budget.
+
+        The remaining tokens are split evenly across this call and the
+        planned calls that have not started yet, so parallel calls cannot
+        starve the ones admitted after them. Unplanned calls may use all of it.
+        """
+        share = self.remaining // max(self.pending, 1)
+        self.pending = max(self.pending - 1, 0)
+        return share
+
+    def reserve(self, tokens: int) -> None:
+        """Hold tokens for an in-flight call so parallel calls cannot overspend"""
+        self.reserved += tokens
+
+    def release(self, tokens: int) -> None:
+        """Return a reservation once the call has finished"""
+        self.reserved = max(self.reserved - tokens, 0)
+
+    def record(self, agent: str, prompt_tokens: int, completion_tokens: int) -> None:
+        """Add one agent call to the ledger"""
+        totals = self.by_agent.setdefault(agent, {"calls": 0, "prompt_tokens": 0, "completion_tokens": 0})
+        totals["calls"] += 1
+        totals["prompt_tokens"] += prompt_tokens
+        totals["completion_tokens"] += completion_tokens
+        self.prompt_tokens += prompt_tokens
+        self.completion_tokens += completion_tokens
+
+    def degrade(self, note: str) -> None:
+        """Record that output was reduced to stay within the budget"""
+        self.degradations.append(note)
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "prompt_tokens": self.prompt_tokens,
+            "completion_tokens": self.completion_tokens,
+            "total_tokens": self.total_tokens,
+            "budget": self.budget,
+            "remaining": self.remaining,
+            "degraded": list(self.degradations),
+            "by_agent": {agent: dict(totals) for agent, totals in self.by_agent.items()}
+        }
+
+
+_current_usage: ContextVar[Optional[TokenUsage]] = ContextVar("token_usage", default=None)
+
+
+def get_token_usage() -> Optional[TokenUsage]:
+    """Return the ledger of the workflow running in the current context"""
+    return _current_usage.get()
+
+
+def set_token_usage(usage: Optional[TokenUsage]):
+    """Install a ledger for the current context and return the reset token"""
+    return _current_usage.set(usage)
+
+
+def reset_token_usage(token) -> None:
+    """Restore the ledger that was active before set_token_usage"""
+    _current_usage.reset(token)
@@ -0,0 +1,114 @@
+from typing import Dict, Any, Optional, Callable, Awaitable, List
+from datetime import datetime, UTC
+import asyncio
+import time
+import uuid
+from models.pydantic_models import MarketingRequest
+from utils.exceptions import JobQueueFullException
+from utils.logger import logger
+
+class JobQueue:
+    """Bounded in-process queue that runs workflow jobs on a fixed pool of workers."""
+
+    def __init__(
+        self,
+        runner: Callable[[MarketingRequest], Awaitable[Dict[str, Any]]],
+        workers: int = 4,
+        max_queue_size: int = 100,
+        result_ttl_seconds: int = 3600
+    ):
+        self.runner = runner
+        self.workers = workers
+        self.max_queue_size = max_queue_size
+        self.result_ttl_seconds = result_ttl_seconds
+        self.jobs: Dict[str, Dict[str, Any]] = {}
+        self._queue: Optional[asyncio.Queue] = None
+        self._tasks: List[asyncio.Task] = []
+        self._expires_at: Dict[str, float] = {}
+
+    async def start(self) -> None:
+        """Start the worker tasks."""
+        self._queue = asyncio.Queue(maxsize=self.max_queue_size)
+        self._tasks = [
+            asyncio.create_task(self._worker(index), name=f"job-worker-{index}")
+            for index in range(self.workers)
+        ]
+        logger.logger.info(f"Job queue started with {self.workers} workers")
+
+    async def stop(self) -> None:
+        """Cancel the workers; queued and running jobs are abandoned."""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        logger.logger.info("Job queue stopped")
+
+    def submit(self, request: MarketingRequest) -> Dict[str, Any]:
+        """Queue a request and return its job record without waiting for it."""
+        if self._queue is None:
+            raise RuntimeError("Job queue is not started")
+        self._prune()
+
+        job_id = str(uuid.uuid4())
+        job = {
+            "job_id": job_id,
+            "request_id": request.request_id,
+            "status": "queued",
+            "submitted_at": datetime.now(UTC).isoformat(),
+            "started_at": None,
+            "finished_at": None,
+            "result": None,
+            "error": None
+        }
+        try:
+            self._queue.put_nowait((job_id, request))
+        except asyncio.QueueFull:
+            raise JobQueueFullException(self.max_queue_size)
+        self.jobs[job_id] = job
+        logger.log_workflow_step(request.request_id, "job_queued", {"job_id": job_id})
+        return job
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Return the job record, or None if it is unknown or expired."""
+        self._prune()
+        return self.jobs.get(job_id)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return queue depth and job counts by status."""
+        counts: Dict[str, int] = {}
+        for job in self.jobs.values():
+            counts[job["status"]] = counts.get(job["status"], 0) + 1
+        return {
+            "workers": self.workers,
+            "queued": self._queue.qsize() if self._queue else 0,
+            "max_queue_size": self.max_queue_size,
+            "jobs": counts
+        }
+
+    def _prune(self) -> None:
+        """Forget finished jobs whose results have outlived the TTL."""
+        now = time.monotonic()
+        for job_id in [job_id for job_id, expires_at in self._expires_at.items() if expires_at < now]:
+            del self._expires_at[job_id]
+            self.jobs.pop(job_id, None)
+
+    async def _worker(self, index: int) -> None:
+        while True:
+            job_id, request = await self._queue.get()
+            job = self.jobs.get(job_id)
+            try:
+                if job is None:
+                    continue
+                job["status"] = "running"
+                job["started_at"] = datetime.now(UTC).isoformat()
+                try:
+                    job["result"] = await self.runner(request)
+                    job["status"] = "completed"
+                except Exception as e:
+                    logger.log_error(request.request_id, f"Job {job_id} failed: {str(e)}")
+                    job["error"] = str(e)
+                    job["status"] = "failed"
+                job["finished_at"] = datetime.now(UTC).isoformat()
+                self._expires_at[job_id] = time.monotonic() + self.result_ttl_seconds
+            finally:
+                self._queue.task_done()
@@ -1,14 +1,28 @@
-from typing import Dict, List, Any, TypedDict, Annotated, Union
-from langgraph.graph import Graph, StateGraph, END
+from typing import TYPE_CHECKING, Dict, List, Any, TypedDict, Annotated, Union, Optional, AsyncIterator, AsyncContextManager, Callable, Awaitable, Mapping
 from datetime import datetime
-from agents.base_agent import BaseAgent
-from agents.ceo_agent import CEOAgent
-from agents.summarizer_agent import SummarizerAgent
 from utils.logger import logger
+from utils.cache import CacheBackend, build_cache, make_cache_key, normalize_prompt
+from utils.metrics import WORKFLOW_NODE_LATENCY, WORKFLOW_REQUESTS, WORKFLOWS_IN_FLIGHT
+from utils.tokens import TokenUsage, get_token_usage, set_token_usage, reset_token_usage
+from utils.exceptions import CheckpointNotFoundException, RequestConflictException, TokenBudgetExceededException, WorkflowException
+from config.settings import get_settings
 from functools import partial
-import json
 import operator
 
+if TYPE_CHECKING:
+    # langgraph and the agents are imported when the graph is built, keeping this module cheap to import
+    from langgraph.checkpoint.base import BaseCheckpointSaver
+    from langgraph.graph import Graph
+    from langgraph.types import StateSnapshot
+    from agents.base_agent import BaseAgent
+    from agents.ceo_agent import CEOAgent
+    from agents.summarizer_agent import SummarizerAgent
+
+settings = get_settings()
+
+# Bumped whenever the cached result shape changes, so older entries are not replayed
+RESULT_VERSION = 2
+
 def choose_latter(a: str, b: str) -> str:
     """Return the second value, implementing a proper reducer signature."""
     return b
@@ -23,38 +37,96 @@ class WorkflowState(TypedDict, total=False):
     final_response: Dict
     errors: Annotated[List[str], operator.add]
     current_step: str
+    response_depth: str
+
+def instrument_node(name: str, node: Callable[[Dict], Awaitable[Dict[str, Any]]]) -> Callable[[Dict], Awaitable[Dict[str, Any]]]:
+    """Wrap a node so its latency is recorded under its graph name."""
+    async def timed_node(state: Dict) -> Dict[str, Any]:
+        with WORKFLOW_NODE_LATENCY.time(node=name):
+            return await node(state)
+    return timed_node
+
+def department_request(task_info: Dict[str, Any]) -> Dict[str, Any]:
+    """Build a department agent's prompt variables from the task the CEO assigned."""
+    return {
+        "task": task_info["task"],
+        "priority": task_info.get("priority", 1),
+        "context": task_info.get("context", {})
+    }
 
 def create_marketing_workflow(
-    ceo_agent: CEOAgent,
-    department_agents: Dict[str, BaseAgent],
-    summarizer_agent: SummarizerAgent
-) -> Graph:
-    """Create the marketing workflow graph."""
+    ceo_agent: "CEOAgent",
+    department_agents: Mapping[str, "BaseAgent"],
+    summarizer_agent: "SummarizerAgent",
+    checkpointer: Optional["BaseCheckpointSaver"] = None
+) -> "Graph":
+    """
+    Create the marketing workflow graph.
+    
+    One node is added per department agent, keyed by its code; with the
+    registry's lazy mapping, an agent is only constructed once the CEO
+    first routes work to it. With a checkpointer, state is saved after
+    every step under the request_id, so a run that fails in route,
+    summarize or finalize can be resumed at that node instead of starting
+    over.
+    """
+    from langgraph.graph import StateGraph, END
+    from langgraph.types import Send
     
     workflow = StateGraph(WorkflowState)
     
+    def plan_token_budget(state: Dict, selected: Dict[str, Dict]) -> None:
+        """
+        Announce the remaining calls to the request's token ledger before fan-out.
+
+        In "reject" mode the departments must all fit at full max_tokens, so
+        an unaffordable request fails here instead of after they have run.
+        """
+        usage = get_token_usage()
+        if usage is None or usage.budget is None:
+            return
+        if settings.TOKEN_BUDGET_MODE == "reject":
+            required = sum(
+                department_agents[dept].estimate_tokens(department_request(task_info))
+                for dept, task_info in selected.items()
+            )
+            if required > usage.remaining:
+                raise TokenBudgetExceededException("Selected departments", required, usage.remaining)
+        # Departments, the summarizer and, for full responses, the final report
+        usage.plan(len(selected) + 1 + int(state.get("response_depth") == "full"))
+
     async def route_to_departments(state: Dict) -> Dict[str, Any]:
         """Route initial request to departments."""
         try:
             logger.logger.info(f"CEO Agent processing request: {state['original_request']}")
             departments = await ceo_agent.determine_required_departments(state["original_request"])
+            if "error" in departments:
+                raise ValueError(departments["error"])
             selected = departments.get("selected_departments", {})
             
-            logger.logger.info(f"CEO Agent selected departments: {json.dumps(selected, indent=2)}")
+            logger.log_payload("CEO Agent selected departments", selected)
             
             if not isinstance(selected, dict):
                 raise ValueError("CEO response format invalid")
                 
             selected = {k.lower(): v for k, v in selected.items()}
+            unknown = [dept for dept in selected if dept not in department_agents]
+            if unknown:
+                logger.logger.warning(f"CEO Agent selected unknown departments, ignoring: {unknown}")
+                selected = {k: v for k, v in selected.items() if k in department_agents}
+            plan_token_budget(state, selected)
             
             return {
                 "selected_departments": selected,
                 "department_responses": {},
                 "status": "departments_assigned"
             }
+        except TokenBudgetExceededException:
+            raise
         except Exception as e:
+            # Raise rather than record the failure so the checkpoint stays resumable at route
             logger.logger.error(f"CEO Process Failed: {str(e)}")
-            return {"status": "failed", "errors": [str(e)]}
+            raise WorkflowException(f"CEO routing failed: {str(e)}")
 
     async def process_department(state: Dict, department: str) -> Dict[str, Any]:
         """Process department task."""
@@ -62,15 +134,11 @@ def create_marketing_workflow(
         try:
             if department in state["selected_departments"]:
                 task_info = state["selected_departments"][department]
-                logger.logger.info(f"{department.upper()} Agent received task: {json.dumps(task_info, indent=2)}")
+                logger.log_payload(f"{department.upper()} Agent received task", task_info)
                 
-                response = await department_agents[department].process({
-                    "task": task_info["task"],
-                    "priority": task_info.get("priority", 1),
-                    "context": task_info.get("context", {})
-                })
+                response = await department_agents[department].process(department_request(task_info))
                 
-                logger.logger.info(f"{department.upper()} Agent response: {json.dumps(response, indent=2)}")
+                logger.log_agent_completion(state["request_id"], department, response)
                 
                 return {
                     "department_responses": {department: response}
@@ -79,17 +147,57 @@ def create_marketing_workflow(
             logger.logger.info(f"{department.upper()} Agent skipped - not in selected departments")
             return {}
                 
+        except TokenBudgetExceededException as e:
+            if settings.TOKEN_BUDGET_MODE != "degrade":
+                raise
+            # Skip the department rather than fail the request
+            get_token_usage().degrade(f"{department} skipped: token budget exhausted")
+            logger.logger.warning(f"Request {state['request_id']}: skipping {department}, {e.message}")
+            return {
+                "department_responses": {department: {"status": "skipped", "reason": e.message}}
+            }
         except Exception as e:
             logger.log_agent_error(state["request_id"], department, str(e))
             return {
                 "errors": [f"{department} processing failed: {str(e)}"]
             }
 
+    def dispatch_departments(state: Dict) -> Union[List["Send"], str]:
+        """Fan out only to the departments the CEO selected."""
+        if state.get("status") == "failed":
+            return END
+        selected = state.get("selected_departments", {})
+        if not selected:
+            return "join"
+        return [Send(dept, state) for dept in selected]
+
+    def final_report_input(state: Dict) -> Dict[str, Any]:
+        """Build the CEO final report prompt variables from the state."""
+        return {
+            "original_request": state["original_request"],
+            "summary": state["summarized_response"],
+            "department_selection": state["selected_departments"]
+        }
+
+    def should_finalize(state: Dict) -> str:
+        """Only run the CEO final report when the caller asked for it and it is affordable."""
+        if state.get("response_depth") != "full" or state.get("status") != "summarized":
+            return END
+        if settings.TOKEN_BUDGET_MODE == "degrade" and not ceo_agent.fits_token_budget(
+            "final_response", final_report_input(state)
+        ):
+            usage = get_token_usage()
+            if usage is not None:
+                usage.degrade("finalize skipped: token budget exhausted")
+            logger.logger.warning(f"Request {state['request_id']}: skipping final report, token budget exhausted")
+            return END
+        return "finalize"
+
     async def join_responses(state: Dict) -> Dict[str, Any]:
         """Join all department responses."""
         logger.logger.info("Starting response join process")
         current_responses = state.get("department_responses", {})
-        logger.logger.info(f"Current responses: {json.dumps(current_responses, indent=2)}")
+        logger.log_payload("Current responses", current_responses)
         
         return {
             "status": "responses_collected" if len(current_responses) >= len(state["selected_departments"]) else "processing"
@@ -100,7 +208,7 @@ def create_marketing_workflow(
         logger.log_agent_start(state["request_id"], "Summarizer")
         try:
             responses = state.get("department_responses", {})
-            logger.logger.info(f"Responses to summarize: {json.dumps(responses, indent=2)}")
+            logger.log_payload("Responses to summarize", responses)
             
             if len(responses) >= len(state["selected_departments"]):
                 logger.logger.info("Starting summarization process")
@@ -111,7 +219,9 @@ def create_marketing_workflow(
                     "selected_departments": state["selected_departments"]
                 })
                 
-                logger.logger.info(f"Generated summary: {json.dumps(summary, indent=2)}")
+                logger.log_payload("Generated summary", summary)
+                if "error" in summary:
+                    raise ValueError(summary["error"])
                 
                 return {
                     "summarized_response": summary,
@@ -121,25 +231,22 @@ def create_marketing_workflow(
             logger.logger.warning("Incomplete responses for summarization")
             return {"status": "incomplete"}
             
+        except TokenBudgetExceededException:
+            raise
         except Exception as e:
             logger.logger.error(f"Summarization error: {str(e)}")
-            return {
-                "errors": [f"Summarization failed: {str(e)}"],
-                "status": "failed"
-            }
+            raise WorkflowException(f"Summarization failed: {str(e)}")
 
     async def create_final_report(state: Dict) -> Dict[str, Any]:
         """Create final report from CEO."""
         logger.log_agent_start(state["request_id"], "CEO Final Report")
         try:
             if state["status"] == "summarized":
-                final_response = await ceo_agent.create_final_response({
-                    "original_request": state["original_request"],
-                    "summary": state["summarized_response"],
-                    "department_selection": state["selected_departments"]
-                })
+                final_response = await ceo_agent.create_final_response(final_report_input(state))
                 
-                logger.logger.info(f"Generated final response: {json.dumps(final_response, indent=2)}")
+                logger.log_payload("Generated final response", final_response)
+                if "error" in final_response:
+                    raise ValueError(final_response["error"])
                 
                 return {
                     "final_response": final_response,
@@ -148,51 +255,103 @@ def create_marketing_workflow(
             
             return {"status": "waiting_for_summary"}
             
+        except TokenBudgetExceededException:
+            raise
         except Exception as e:
             logger.logger.error(f"Final report creation error: {str(e)}")
-            return {
-                "errors": [f"Final report creation failed: {str(e)}"],
-                "status": "failed"
-            }
+            raise WorkflowException(f"Final report creation failed: {str(e)}")
 
     # Create department processors
     department_processors = {
         dept: partial(process_department, department=dept)
-        for dept in ["seo", "content", "strategy", "advertising", "social", "email", "analytics"]
+        for dept in department_agents
     }
 
     # Add nodes
-    workflow.add_node("route", route_to_departments)
+    workflow.add_node("route", instrument_node("route", route_to_departments))
     for dept, processor in department_processors.items():
-        workflow.add_node(dept, processor)
+        workflow.add_node(dept, instrument_node(dept, processor))
     workflow.add_node("join", join_responses)
-    workflow.add_node("summarize", summarize_results)
-    workflow.add_node("finalize", create_final_report)
+    workflow.add_node("summarize", instrument_node("summarize", summarize_results))
+    workflow.add_node("finalize", instrument_node("finalize", create_final_report))
 
-    # Add edges
+    # Add edges; departments are only scheduled when dispatched by the CEO
+    workflow.add_conditional_edges(
+        "route",
+        dispatch_departments,
+        [*department_processors, "join", END]
+    )
     for dept in department_processors:
-        workflow.add_edge("route", dept)
         workflow.add_edge(dept, "join")
     
     workflow.add_edge("join", "summarize")
-    workflow.add_edge("summarize", "finalize")
+    workflow.add_conditional_edges("summarize", should_finalize, ["finalize", END])
     workflow.add_edge("finalize", END)
 
     workflow.set_entry_point("route")
     
-    compiled = workflow.compile()
+    compiled = workflow.compile(checkpointer=checkpointer)
     logger.logger.info("Workflow compiled successfully")
     return compiled
 
-async def execute_workflow(
-    workflow: Graph,
-    request_id: str,
-    prompt: str
-) -> Dict[str, Any]:
-    """Execute the marketing workflow."""
-    logger.log_request(request_id, prompt)
-    
-    initial_state = WorkflowState(
+def open_checkpointer(path: Optional[str] = None) -> AsyncContextManager["BaseCheckpointSaver"]:
+    """Open the SQLite checkpointer that persists workflow state per request_id."""
+    from langgraph.checkpoint.sqlite.aio import AsyncSqliteSaver
+    return AsyncSqliteSaver.from_conn_string(path or settings.CHECKPOINT_DB_PATH)
+
+def _thread_config(request_id: str) -> Dict[str, Any]:
+    """Graph config that keys checkpoints by request_id."""
+    return {"configurable": {"thread_id": request_id}}
+
+async def load_checkpoint(workflow: "Graph", request_id: str) -> Optional["StateSnapshot"]:
+    """Return the saved state of a request's workflow, or None without one."""
+    if getattr(workflow, "checkpointer", None) is None:
+        return None
+    snapshot = await workflow.aget_state(_thread_config(request_id))
+    return snapshot if snapshot.values else None
+
+def _check_resumable(snapshot: "StateSnapshot", request_id: str, prompt: str, response_depth: str) -> None:
+    """Refuse to resume a checkpoint that was created for a different request."""
+    values = snapshot.values
+    if values.get("original_request") != prompt or values.get("response_depth") != response_depth:
+        raise RequestConflictException(request_id, details={"request_id": request_id})
+
+_result_cache: Optional[CacheBackend] = None
+
+def get_result_cache() -> Optional[CacheBackend]:
+    """Return the shared workflow result cache, or None when disabled."""
+    global _result_cache
+    if not settings.WORKFLOW_CACHE_ENABLED:
+        return None
+    if _result_cache is None:
+        _result_cache = build_cache(
+            max_size=settings.WORKFLOW_CACHE_MAX_SIZE,
+            ttl_seconds=settings.WORKFLOW_CACHE_TTL_SECONDS,
+            sqlite_path=settings.WORKFLOW_CACHE_SQLITE_PATH,
+            table="workflow_results"
+        )
+    return _result_cache
+
+def _is_cacheable(result: Dict[str, Any]) -> bool:
+    """Only cache results where no agent returned an error payload."""
+    outputs = [result["summary"], *result["department_responses"].values()]
+    if "final_report" in result:
+        outputs.append(result["final_report"])
+    return all(isinstance(output, dict) and "error" not in output for output in outputs)
+
+def workflow_cache_key(prompt: str, response_depth: str = "summary") -> str:
+    """Key a workflow result by normalized prompt, response depth and model settings."""
+    return make_cache_key(
+        "workflow",
+        RESULT_VERSION,
+        normalize_prompt(prompt),
+        response_depth,
+        settings.get_openai_config()
+    )
+
+def build_initial_state(request_id: str, prompt: str, response_depth: str = "summary") -> WorkflowState:
+    """Build the initial graph state for a request."""
+    return WorkflowState(
         request_id=request_id,
         original_request=prompt,
         status="pending",
@@ -201,28 +360,233 @@ async def execute_workflow(
         summarized_response={},
         final_response={},
         errors=[],
-        current_step="start"
+        current_step="start",
+        response_depth=response_depth
     )
+
+def _build_result(request_id: str, final_state: Dict[str, Any]) -> Dict[str, Any]:
+    """Turn the final graph state into the workflow result."""
+    if final_state["status"] == "failed":
+        error_msg = f"Workflow failed: {final_state.get('errors', [])}"
+        logger.log_error(request_id, error_msg)
+        raise Exception(error_msg)
+    
+    result = {
+        "status": "success",
+        "selected_departments": final_state.get("selected_departments", {}),
+        "summary": final_state.get("summarized_response", {}),
+        "department_responses": final_state.get("department_responses", {})
+    }
+    if final_state.get("response_depth") == "full":
+        result["final_report"] = final_state.get("final_response", {})
+    return result
+
+async def _store_result(cache: Optional[CacheBackend], cache_key: str, result: Dict[str, Any]) -> None:
+    """Cache a workflow result, never failing the request on cache errors."""
+    if cache is not None and _is_cacheable(result):
+        try:
+            await cache.aset(cache_key, result)
+        except Exception as cache_error:
+            logger.logger.warning(f"Failed to cache workflow result: {str(cache_error)}")
+
+def _replay_events(result: Dict[str, Any], usage: TokenUsage) -> List[Dict[str, Any]]:
+    """Stream events for a result that was already produced."""
+    events = [{"event": "departments_selected", "data": {"selected_departments": result["selected_departments"]}}]
+    events += [
+        {"event": "department_response", "data": {"department": department, "response": response}}
+        for department, response in result["department_responses"].items()
+    ]
+    events.append({"event": "summary", "data": {"summary": result["summary"]}})
+    if "final_report" in result:
+        events.append({"event": "final_report", "data": {"final_report": result["final_report"]}})
+    events.append({"event": "complete", "data": {"status": result["status"], "cached": True, "token_usage": usage.as_dict()}})
+    return events
+
+async def execute_workflow(
+    workflow: "Graph",
+    request_id: str,
+    prompt: str,
+    response_depth: str = "summary",
+    token_budget: Optional[int] = None,
+    use_cache: bool = True
+) -> Dict[str, Any]:
+    """
+    Execute the marketing workflow.
     
+    If the request_id already has a checkpoint, a finished run is replayed
+    and an unfinished one resumes at its first incomplete node.
+    """
+    logger.log_request(request_id, prompt)
+    
+    usage = TokenUsage(token_budget or settings.TOKEN_BUDGET_DEFAULT)
+    cache = get_result_cache() if use_cache else None
+    cache_key = workflow_cache_key(prompt, response_depth) if cache is not None else None
+    if cache is not None:
+        cached = await cache.aget(cache_key)
+        if cached is not None:
+            logger.log_workflow_step(request_id, "cache_hit")
+            WORKFLOW_REQUESTS.inc(status="cache_hit")
+            return {**cached, "cached": True, "token_usage": usage.as_dict()}
+    
+    usage_token = set_token_usage(usage)
     try:
-        logger.logger.info(f"Starting workflow execution with state: {json.dumps(initial_state, indent=2)}")
-        final_state = await workflow.ainvoke(initial_state)
-        logger.logger.info(f"Final workflow state: {json.dumps(final_state, indent=2)}")
+        checkpoint = await load_checkpoint(workflow, request_id)
+        if checkpoint is None:
+            graph_input = build_initial_state(request_id, prompt, response_depth)
+            logger.log_payload("Starting workflow execution with state", graph_input)
+        else:
+            _check_resumable(checkpoint, request_id, prompt, response_depth)
+            if not checkpoint.next:
+                logger.log_workflow_step(request_id, "checkpoint_replay")
+                WORKFLOW_REQUESTS.inc(status="checkpoint_replay")
+                return {**_build_result(request_id, checkpoint.values), "cached": True, "token_usage": usage.as_dict()}
+            graph_input = None
+            logger.log_workflow_step(request_id, "resume", {"next": list(checkpoint.next)})
         
-        if final_state["status"] == "failed":
-            error_msg = f"Workflow failed: {final_state.get('errors', [])}"
-            logger.log_error(request_id, error_msg)
-            raise Exception(error_msg)
+        with WORKFLOWS_IN_FLIGHT.track_inprogress():
+            final_state = await workflow.ainvoke(graph_input, config=_thread_config(request_id))
+        logger.log_payload("Final workflow state", final_state)
         
-        result = {
-            "status": "success",
-            "summary": final_state.get("summarized_response", {}),
-            "department_responses": final_state.get("department_responses", {})
-        }
-        logger.logger.info(f"Workflow result: {json.dumps(result, indent=2)}")
-        return result
+        result = _build_result(request_id, final_state)
+        logger.log_payload("Workflow result", result)
+        if not usage.degradations:
+            await _store_result(cache, cache_key, result)
+        WORKFLOW_REQUESTS.inc(status="success")
+        return {**result, "cached": False, "token_usage": usage.as_dict()}
         
+    except TokenBudgetExceededException as e:
+        WORKFLOW_REQUESTS.inc(status="budget_exceeded")
+        logger.log_error(request_id, f"Workflow rejected: {e.message}")
+        raise
+    except RequestConflictException as e:
+        WORKFLOW_REQUESTS.inc(status="conflict")
+        logger.log_error(request_id, e.message)
+        raise
     except Exception as e:
+        WORKFLOW_REQUESTS.inc(status="error")
         error_msg = f"Workflow execution failed: {str(e)}"
         logger.log_error(request_id, error_msg)
-        raise Exception(error_msg)
\ No newline at end of file
+        raise Exception(error_msg)
+    finally:
+        reset_token_usage(usage_token)
+
+async def resume_workflow(
+    workflow: "Graph",
+    request_id: str,
+    token_budget: Optional[int] = None
+) -> Dict[str, Any]:
+    """Resume a checkpointed request at its first incomplete node, or replay it if finished."""
+    checkpoint = await load_checkpoint(workflow, request_id)
+    if checkpoint is None:
+        raise CheckpointNotFoundException(request_id)
+    return await execute_workflow(
+        workflow=workflow,
+        request_id=request_id,
+        prompt=checkpoint.values["original_request"],
+        response_depth=checkpoint.values.get("response_depth", "summary"),
+        token_budget=token_budget
+    )
+
+async def stream_workflow(
+    workflow: "Graph",
+    request_id: str,
+    prompt: str,
+    response_depth: str = "summary",
+    token_budget: Optional[int] = None,
+    use_cache: bool = True
+) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Execute the marketing workflow, yielding an event as each node finishes.
+    
+    Events are dicts with an "event" name and a "data" payload:
+    "departments_selected", one "department_response" per department,
+    "summary", "final_report" when response_depth is "full", and finally
+    "complete". A checkpointed request resumes like execute_workflow, first
+    re-emitting the events of the steps that had already finished.
+    """
+    logger.log_request(request_id, prompt)
+    
+    usage = TokenUsage(token_budget or settings.TOKEN_BUDGET_DEFAULT)
+    cache = get_result_cache() if use_cache else None
+    cache_key = workflow_cache_key(prompt, response_depth) if cache is not None else None
+    if cache is not None:
+        cached = await cache.aget(cache_key)
+        if cached is not None:
+            logger.log_workflow_step(request_id, "cache_hit")
+            WORKFLOW_REQUESTS.inc(status="cache_hit")
+            for event in _replay_events(cached, usage):
+                yield event
+            return
+    
+    # The generator may be resumed from different contexts, so the ledger is
+    # installed without a matching reset; it dies with the streaming task.
+    set_token_usage(usage)
+    final_state: Dict[str, Any] = {}
+    try:
+        WORKFLOWS_IN_FLIGHT.inc()
+        checkpoint = await load_checkpoint(workflow, request_id)
+        if checkpoint is None:
+            graph_input = build_initial_state(request_id, prompt, response_depth)
+        else:
+            _check_resumable(checkpoint, request_id, prompt, response_depth)
+            if not checkpoint.next:
+                logger.log_workflow_step(request_id, "checkpoint_replay")
+                WORKFLOW_REQUESTS.inc(status="checkpoint_replay")
+                for event in _replay_events(_build_result(request_id, checkpoint.values), usage):
+                    yield event
+                return
+            graph_input = None
+            logger.log_workflow_step(request_id, "resume", {"next": list(checkpoint.next)})
+            values = checkpoint.values
+            if values.get("selected_departments"):
+                yield {"event": "departments_selected", "data": {"selected_departments": values["selected_departments"]}}
+            for department, response in values.get("department_responses", {}).items():
+                yield {"event": "department_response", "data": {"department": department, "response": response}}
+            if values.get("status") == "summarized":
+                yield {"event": "summary", "data": {"summary": values["summarized_response"]}}
+        
+        async for mode, chunk in workflow.astream(
+            graph_input,
+            config=_thread_config(request_id),
+            stream_mode=["updates", "values"]
+        ):
+            if mode == "values":
+                final_state = chunk
+                continue
+            for node, update in chunk.items():
+                if not update:
+                    continue
+                if node == "route" and update.get("status") != "failed":
+                    yield {
+                        "event": "departments_selected",
+                        "data": {"selected_departments": update.get("selected_departments", {})}
+                    }
+                elif update.get("department_responses"):
+                    for department, response in update.get("department_responses", {}).items():
+                        yield {"event": "department_response", "data": {"department": department, "response": response}}
+                elif node == "summarize" and "summarized_response" in update:
+                    yield {"event": "summary", "data": {"summary": update["summarized_response"]}}
+                elif node == "finalize" and "final_response" in update:
+                    yield {"event": "final_report", "data": {"final_report": update["final_response"]}}
+        
+        result = _build_result(request_id, final_state)
+    except TokenBudgetExceededException as e:
+        WORKFLOW_REQUESTS.inc(status="budget_exceeded")
+        logger.log_error(request_id, f"Workflow rejected: {e.message}")
+        raise
+    except RequestConflictException as e:
+        WORKFLOW_REQUESTS.inc(status="conflict")
+        logger.log_error(request_id, e.message)
+        raise
+    except Exception as e:
+        WORKFLOW_REQUESTS.inc(status="error")
+        error_msg = f"Workflow execution failed: {str(e)}"
+        logger.log_error(request_id, error_msg)
+        raise Exception(error_msg)
+    finally:
+        WORKFLOWS_IN_FLIGHT.dec()
+    
+    WORKFLOW_REQUESTS.inc(status="success")
+    if not usage.degradations:
+        await _store_result(cache, cache_key, result)
+    yield {"event": "complete", "data": {"status": result["status"], "cached": False, "token_usage": usage.as_dict()}}